@@ -0,0 +1,229 @@
+"""
+性能基准测试
+
+    python benchmark.py run [-o 结果.json] [-k 名称片段] [--repeat N]
+    python benchmark.py compare 基准.json 结果.json [--threshold 1.2]
+
+run 按多个数据规模运行各项基准，把每项的最短和中位耗时保存为 JSON；
+compare 比较两次结果的中位耗时，变慢超过阈值的项目视为性能回退，返回非零退出码。
+计算模型（calculate_model）不在本仓库中，模型及曲线扫描的基准需在完整环境中另行补充。
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import window
+
+SIZES = (1, 1000, 100000)  # 数据规模（井数、曲线点数或表格行数）
+REPORT_SIZES = (1, 10, 100)  # 报告份数；每份报告耗时较长，使用较小的规模
+EXCEL_SIZES = (1, 1000, 10000)  # Excel 参数表行数；生成大工作簿本身较慢
+
+
+def _figure():
+    """创建不依赖界面的 matplotlib 图形"""
+    window._lazy_import("matplotlib.backends.backend_agg")
+    return window._lazy_import("matplotlib.figure").Figure(figsize=(6, 4))
+
+
+def _chart_png():
+    """生成一张报告图表图片"""
+    figure = _figure()
+    figure.gca().plot(np.arange(100), np.sin(np.arange(100) / 10))
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
+
+
+def _template(directory):
+    """生成包含全部占位符的报告模板，返回模板路径"""
+    doc = window._lazy_import("docx").Document()
+    for placeholder in window.TEXT_PLACEHOLDERS:
+        doc.add_paragraph(f"{placeholder[2:-2]}：{placeholder}")
+    table = doc.add_table(rows=1, cols=len(window.CHART_PLACEHOLDERS))
+    for cell, placeholder in zip(table.rows[0].cells, window.CHART_PLACEHOLDERS):
+        cell.paragraphs[0].add_run(placeholder)
+    path = os.path.join(directory, "template.docx")
+    doc.save(path)
+    return path
+
+
+def _result_dict(i=0):
+    return {
+        "冲蚀速率": 0.1 + i, "长期腐蚀速率": 0.01, "最大外压力": 45.6, "最大内压力": 12.3,
+        "剩余抗外挤强度": 50.0, "剩余抗内挤强度": 60.5, "安全等级": "安全",
+    }
+
+
+def _input_sheet(path, size):
+    """生成 size 行的 Excel 输入表：前面为标准输入表的参数（文本参数取下拉框第一项），其余为填充行"""
+    labels = {row: label for label, (row, _) in window.INPUT_PARAMETERS.items()}
+    texts = {3: window.SHAPES, 18: window.MATERIALS, 25: window.CASING_TYPES, 37: window.CASING_GRADES}
+    window._lazy_import("pandas").DataFrame({
+        "参数": [labels.get(i, f"参数{i}") for i in range(size)],
+        "值": [texts[i][0] if i in texts else float(i) for i in range(size)],
+    }).to_excel(path, index=False)
+    return path
+
+
+def bench_excel_read(size, directory):
+    """read_input_table 读取参数表：表格共 size 行，只读取前 50 行的两列"""
+    path = _input_sheet(os.path.join(directory, f"input_{size}.xlsx"), size)
+    return lambda: window.read_input_table(path)
+
+
+def bench_extract_fields(size, directory):
+    """按字段映射从 read_input_table 读出的参数表中取出 size 口井的全部输入参数"""
+    table = window.read_input_table(_input_sheet(os.path.join(directory, "input_fields.xlsx"), 50))
+    table = np.tile(table, (1, size))  # 输入表只有一口井，复制为 size 口井
+    selections = {"well_type": "气井数据", "wear_model": "套管磨损面积(线性关系)", "formation": "非塑性蠕变地层"}
+
+    def run():
+        for selector in window.select_fields(selections):
+            window.extract_fields(selector, table)
+    return run
+
+
+def bench_decimate(size, directory):
+    """size 点曲线绘图前的最小-最大抽稀"""
+    x = np.linspace(1, 10000, size)
+    y = np.sin(x / 37)
+    return lambda: window.decimate_minmax(x, y)
+
+
+def bench_savefig(size, directory):
+    """报告图表：绘制 size 点曲线（抽稀后）并以 300 dpi 保存为 PNG"""
+    figure = _figure()
+    axes = figure.gca()
+    x = np.linspace(1, 10000, size)
+    axes.plot(*window.decimate_minmax(x, np.sin(x / 37)))
+
+    def run():
+        figure.savefig(io.BytesIO(), format="png", dpi=300, bbox_inches="tight")
+    return run
+
+
+def bench_fill_template(size, directory):
+    """fill_template_with_results 逐份生成 size 份报告（每份都重新读取模板）"""
+    template_path = _template(directory)
+    charts = [_chart_png()] * len(window.CHART_PLACEHOLDERS)
+
+    def run():
+        for i in range(size):
+            window.fill_template_with_results(template_path, _result_dict(i), charts, io.BytesIO())
+    return run
+
+
+def bench_generate_reports(size, directory):
+    """generate_reports 使用预编译模板生成 size 份报告"""
+    template_path = _template(directory)
+    charts = [_chart_png()] * len(window.CHART_PLACEHOLDERS)
+    result_dicts = [_result_dict(i) for i in range(size)]
+    outputs = [io.BytesIO() for _ in range(size)]
+    return lambda: window.generate_reports(template_path, result_dicts, [charts] * size, outputs)
+
+
+# 基准名称 -> (准备函数, 数据规模)；准备函数返回被计时的无参函数
+BENCHMARKS = {
+    "excel_read": (bench_excel_read, EXCEL_SIZES),
+    "extract_fields": (bench_extract_fields, SIZES),
+    "decimate_minmax": (bench_decimate, SIZES),
+    "savefig_300dpi": (bench_savefig, SIZES),
+    "fill_template": (bench_fill_template, REPORT_SIZES),
+    "generate_reports": (bench_generate_reports, REPORT_SIZES),
+}
+
+
+def measure(func, repeat):
+    """预热一次后重复运行 repeat 次，返回每次的耗时（秒）"""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_benchmarks(names=None, repeat=5, sizes=None):
+    """运行基准测试，返回 {"基准名[规模]": {"min": 秒, "median": 秒, "repeat": 次数}}"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (setup, default_sizes) in BENCHMARKS.items():
+            if names and not any(part in name for part in names):
+                continue
+            for size in sizes or default_sizes:
+                times = measure(setup(size, directory), repeat)
+                results[f"{name}[{size}]"] = {"min": min(times), "median": statistics.median(times), "repeat": repeat}
+                print(f"{name}[{size}]".ljust(32), f"{statistics.median(times) * 1000:>12.3f} ms", flush=True)
+    return results
+
+
+def compare_results(baseline, current, threshold=1.2):
+    """
+    比较两次结果的中位耗时
+
+    返回 ([(名称, 基准耗时, 当前耗时, 比值)], [回退的名称])；只比较两次都有的项目
+    """
+    rows = []
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["median"]
+        after = result["median"]
+        ratio = after / before if before > 0 else float("inf")
+        rows.append((name, before, after, ratio))
+        if ratio > threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="性能基准测试")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="运行基准测试并保存结果")
+    run_parser.add_argument("-o", "--output", default="benchmark_results.json", help="结果文件路径")
+    run_parser.add_argument("-k", "--filter", action="append", help="只运行名称包含该片段的基准，可重复指定")
+    run_parser.add_argument("--repeat", type=int, default=5, help="每项重复次数")
+
+    compare_parser = commands.add_parser("compare", help="比较两次结果，变慢超过阈值时返回非零退出码")
+    compare_parser.add_argument("baseline", help="基准结果文件")
+    compare_parser.add_argument("current", help="当前结果文件")
+    compare_parser.add_argument("--threshold", type=float, default=1.2, help="中位耗时比值超过该值视为回退")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(args.filter, args.repeat)
+        meta = {
+            "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.output}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)["results"]
+    rows, regressions = compare_results(baseline, current, args.threshold)
+    print(f"{'基准':<32}{'基准(ms)':>12}{'当前(ms)':>12}{'比值':>8}")
+    for name, before, after, ratio in rows:
+        flag = "  回退" if name in regressions else ""
+        print(f"{name:<32}{before * 1000:>12.3f}{after * 1000:>12.3f}{ratio:>8.2f}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
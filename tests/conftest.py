@@ -0,0 +1,39 @@
+import os
+import struct
+import sys
+import zlib
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _png(width=2, height=2):
+    """生成一张纯白 PNG 图片的字节"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    raw = b"".join(b"\x00" + b"\xff\xff\xff" * width for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw))
+            + chunk(b"IEND", b""))
+
+
+@pytest.fixture
+def chart_images():
+    """5 张图表图片（PNG 字节），与 CHART_PLACEHOLDERS 一一对应"""
+    return [_png(i + 1, i + 1) for i in range(5)]
+
+
+@pytest.fixture
+def result_dict():
+    return {
+        "冲蚀速率": 0.12345,
+        "长期腐蚀速率": 0.00321,
+        "最大外压力": 45.678,
+        "最大内压力": 12.345,
+        "剩余抗外挤强度": 50.0,
+        "剩余抗内挤强度": 60.5,
+        "安全等级": "安全",
+    }
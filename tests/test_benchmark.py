@@ -0,0 +1,49 @@
+import json
+
+import benchmark
+
+
+def write_results(path, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": {}, "results": results}, f)
+    return str(path)
+
+
+def test_run_benchmarks_records_each_size():
+    results = benchmark.run_benchmarks(["decimate"], repeat=2, sizes=(10, 5000))
+
+    assert set(results) == {"decimate_minmax[10]", "decimate_minmax[5000]"}
+    for result in results.values():
+        assert result["repeat"] == 2
+        assert 0 <= result["min"] <= result["median"]
+
+
+def test_compare_results_flags_regressions():
+    baseline = {"a[1]": {"median": 1.0}, "b[1]": {"median": 2.0}, "gone[1]": {"median": 1.0}}
+    current = {"a[1]": {"median": 1.1}, "b[1]": {"median": 3.0}, "new[1]": {"median": 1.0}}
+
+    rows, regressions = benchmark.compare_results(baseline, current, threshold=1.2)
+
+    assert [(name, ratio) for name, _, _, ratio in rows] == [("a[1]", 1.1), ("b[1]", 1.5)]
+    assert regressions == ["b[1]"]
+
+
+def test_compare_command_exit_code(tmp_path, capsys):
+    baseline = write_results(tmp_path / "baseline.json", {"a[1]": {"median": 1.0}})
+    faster = write_results(tmp_path / "faster.json", {"a[1]": {"median": 0.5}})
+    slower = write_results(tmp_path / "slower.json", {"a[1]": {"median": 2.0}})
+
+    assert benchmark.main(["compare", baseline, faster]) == 0
+    assert benchmark.main(["compare", baseline, slower]) == 1
+    assert "回退" in capsys.readouterr().out
+
+
+def test_run_command_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+
+    assert benchmark.main(["run", "-o", str(output), "-k", "extract_fields", "--repeat", "1"]) == 0
+
+    with open(output, encoding="utf-8") as f:
+        data = json.load(f)
+    assert set(data["results"]) == {f"extract_fields[{size}]" for size in benchmark.SIZES}
+    assert data["meta"]["numpy"]
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+import window
+
+
+def test_check_reports_progress_only_when_percent_changes():
+    reported = []
+    token = window.CancelToken(reported.append)
+
+    for i in range(1000):
+        token.check(i, 1000)
+
+    assert reported == list(range(1, 100))
+    assert token.percent == 99
+    assert not token.cancelled
+
+
+def test_check_raises_after_cancel():
+    token = window.CancelToken()
+    token.check()
+
+    token.cancel()
+
+    assert token.cancelled
+    with pytest.raises(window.JobCancelled):
+        token.check(1, 10)
+
+
+def test_cancel_from_another_thread_stops_sweep():
+    token = window.CancelToken()
+    started = threading.Event()
+    outcome = []
+
+    def sweep():
+        try:
+            i = 0
+            while True:
+                token.check(i % 100, 100)
+                started.set()
+                i += 1
+        except window.JobCancelled:
+            outcome.append("cancelled")
+
+    worker = threading.Thread(target=sweep)
+    worker.start()
+    assert started.wait(5)
+    token.cancel()
+    worker.join(5)
+
+    assert not worker.is_alive()
+    assert outcome == ["cancelled"]
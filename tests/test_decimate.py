@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import window
+
+
+def test_short_curve_is_unchanged():
+    x = np.linspace(0, 1, 50)
+    y = np.sin(x)
+
+    dx, dy = window.decimate_minmax(x, list(y))
+
+    assert (dx == x).all()
+    assert (dy == y).all()
+
+
+@pytest.mark.parametrize("length", [2001, 100_000, 1_000_003])
+def test_long_curve_keeps_extremes_and_endpoints(length):
+    x = np.linspace(1, 10000, length)
+    y = np.sin(x / 37) + 1e-3 * x
+    y[length // 3] = 50  # 尖峰
+    y[2 * length // 3] = -50
+
+    dx, dy = window.decimate_minmax(x, y, max_points=2000)
+
+    assert len(dx) == len(dy) <= 2000 + 4
+    assert (np.diff(dx) > 0).all()
+    assert (dx[0], dx[-1]) == (x[0], x[-1])
+    assert dy.max() == 50 and dy.min() == -50
+
+
+def test_every_block_keeps_its_min_and_max():
+    rng = np.random.default_rng(0)
+    y = rng.normal(size=10_000)
+    x = np.arange(len(y))
+
+    _, dy = window.decimate_minmax(x, y, max_points=100)
+
+    blocks = y.reshape(50, 200)
+    assert set(blocks.min(axis=1)) <= set(dy)
+    assert set(blocks.max(axis=1)) <= set(dy)
@@ -0,0 +1,228 @@
+import itertools
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import window  # noqa: E402
+
+TEXT_ROWS = {3: ("圆形", "椭圆形"), 18: ("1Cr", "13Cr"), 25: ("表层套管和技术套管", "其他套管"), 37: ("N80", "Q125")}
+
+
+class Widget:
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    def setValue(self, value):
+        self.log[self.name] = ("value", float(value))
+
+    def setCurrentText(self, text):
+        self.log[self.name] = ("text", text)
+
+
+class Window:
+    """记录每个控件最终被设置的值"""
+
+    def __init__(self):
+        self.widgets = {}
+
+    def __getattr__(self, name):
+        return Widget(name, self.widgets)
+
+
+def make_rows(known_text):
+    """参数表：第 0 列为参数名，第 1 列为本井数据"""
+    values = [1.5 + 0.25 * i for i in range(50)]
+    for row, (known, unknown) in TEXT_ROWS.items():
+        values[row] = known if known_text else unknown
+    return pd.DataFrame({"参数": [f"参数{i}" for i in range(50)], "值": values})
+
+
+def with_labels(rows):
+    """将参数名换成标准输入表中的参数名"""
+    labels = {row: label for label, (row, _) in window.INPUT_PARAMETERS.items()}
+    rows["参数"] = [labels.get(i, f"参数{i}") for i in range(len(rows))]
+    return rows
+
+
+def load_baseline(self, rows, selections):
+    """原 open_excel_file 中逐个控件赋值的实现"""
+    well_type = selections["well_type"]
+    wear_model = selections["wear_model"]
+    formation = selections["formation"]
+    if well_type == "气井数据":
+        self.doubleSpinBox_3.setValue(rows.iloc[0, 1])
+        self.doubleSpinBox_2.setValue(rows.iloc[1, 1])
+        self.doubleSpinBox_5.setValue(rows.iloc[2, 1])
+        if rows.iloc[3, 1] == "圆形":
+            self.comboBox.setCurrentText("圆形")
+        elif rows.iloc[3, 1] == "半圆形":
+            self.comboBox.setCurrentText("半圆形")
+        else:
+            self.comboBox.setCurrentText("角形")
+        self.doubleSpinBox_67.setValue(rows.iloc[4, 1])
+        self.doubleSpinBox_68.setValue(rows.iloc[5, 1])
+        self.doubleSpinBox_69.setValue(rows.iloc[6, 1])
+        if rows.iloc[25, 1] == "表层套管和技术套管":
+            self.comboBox_3.setCurrentText("表层套管和技术套管")
+        else:
+            self.comboBox_3.setCurrentText("生产套管和生产尾管")
+        self.doubleSpinBox_36.setValue(rows.iloc[32, 1])
+        self.doubleSpinBox_40.setValue(rows.iloc[33, 1])
+        self.doubleSpinBox_39.setValue(rows.iloc[30, 1])
+        self.doubleSpinBox_41.setValue(rows.iloc[40, 1])
+        self.doubleSpinBox_37.setValue(rows.iloc[34, 1])
+        self.doubleSpinBox_38.setValue(rows.iloc[35, 1])
+    else:
+        self.doubleSpinBox_8.setValue(rows.iloc[1, 1])
+        self.doubleSpinBox_64.setValue(rows.iloc[7, 1])
+        self.doubleSpinBox_12.setValue(rows.iloc[6, 1])
+        self.doubleSpinBox_13.setValue(rows.iloc[2, 1])
+        self.doubleSpinBox_20.setValue(rows.iloc[8, 1])
+        self.doubleSpinBox_19.setValue(rows.iloc[9, 1])
+        self.doubleSpinBox_17.setValue(rows.iloc[5, 1])
+        self.doubleSpinBox_21.setValue(rows.iloc[10, 1])
+        if rows.iloc[25, 1] == "表层套管和技术套管":
+            self.comboBox_4.setCurrentText("表层套管和技术套管")
+        else:
+            self.comboBox_4.setCurrentText("生产套管和生产尾管")
+        self.doubleSpinBox_42.setValue(rows.iloc[32, 1])
+        self.doubleSpinBox_46.setValue(rows.iloc[29, 1])
+        self.doubleSpinBox_47.setValue(rows.iloc[36, 1])
+        self.doubleSpinBox_43.setValue(rows.iloc[30, 1])
+        self.doubleSpinBox_44.setValue(rows.iloc[34, 1])
+
+    if wear_model == "套管磨损面积(线性关系)":
+        self.doubleSpinBox_26.setValue(rows.iloc[11, 1])
+        self.doubleSpinBox_27.setValue(rows.iloc[12, 1])
+        self.doubleSpinBox_25.setValue(rows.iloc[13, 1])
+        self.doubleSpinBox_24.setValue(rows.iloc[14, 1])
+        self.doubleSpinBox_22.setValue(rows.iloc[15, 1])
+        self.doubleSpinBox_23.setValue(rows.iloc[16, 1])
+        self.doubleSpinBox_30.setValue(rows.iloc[39, 1]/2)
+        self.doubleSpinBox_71.setValue(rows.iloc[41, 1])
+        self.doubleSpinBox_28.setValue(rows.iloc[42, 1])
+        self.doubleSpinBox_29.setValue(rows.iloc[43, 1])
+        self.doubleSpinBox_45.setValue(rows.iloc[44, 1])
+        self.doubleSpinBox_49.setValue(rows.iloc[45, 1])
+        self.doubleSpinBox_50.setValue(rows.iloc[46, 1])
+    else:
+        self.doubleSpinBox_28.setValue(rows.iloc[14, 1] / 2)
+        self.doubleSpinBox_30.setValue(rows.iloc[17, 1])
+
+    if rows.iloc[18, 1] == "碳钢":
+        self.comboBox.setCurrentText("碳钢")
+    elif rows.iloc[18, 1] == "1Cr":
+        self.comboBox.setCurrentText("1Cr")
+    else:
+        self.comboBox.setCurrentText("3Cr")
+    self.doubleSpinBox.setValue(rows.iloc[19, 1])
+    self.doubleSpinBox_32.setValue(rows.iloc[20, 1])
+    self.doubleSpinBox_34.setValue(rows.iloc[21, 1])
+    self.doubleSpinBox_33.setValue(rows.iloc[22, 1])
+    self.doubleSpinBox_35.setValue(rows.iloc[23, 1])
+    self.doubleSpinBox_54.setValue(rows.iloc[24, 1])
+
+    if formation == "非塑性蠕变地层":
+        if rows.iloc[25, 1] == "表层套管和技术套管":
+            self.comboBox_5.setCurrentText("表层套管和技术套管")
+        else:
+            self.comboBox_5.setCurrentText("生产套管和生产尾管")
+        self.doubleSpinBox_56.setValue(rows.iloc[24, 1])
+        self.doubleSpinBox_57.setValue(rows.iloc[27, 1])
+        self.doubleSpinBox_59.setValue(rows.iloc[28, 1])
+        self.doubleSpinBox_65.setValue(rows.iloc[29, 1])
+        self.doubleSpinBox_58.setValue(rows.iloc[30, 1])
+    else:
+        if rows.iloc[25, 1] == "表层套管和技术套管":
+            self.comboBox_6.setCurrentText("表层套管和技术套管")
+        else:
+            self.comboBox_6.setCurrentText("生产套管和生产尾管")
+        self.doubleSpinBox_60.setValue(rows.iloc[28, 1])
+        self.doubleSpinBox_66.setValue(rows.iloc[29, 1])
+        self.doubleSpinBox_62.setValue(rows.iloc[27, 1])
+        self.doubleSpinBox_63.setValue(rows.iloc[31, 1])
+        self.doubleSpinBox_61.setValue(rows.iloc[30, 1])
+
+    self.doubleSpinBox_48.setValue(rows.iloc[6, 1])
+    self.doubleSpinBox_51.setValue(rows.iloc[24, 1])
+    if rows.iloc[37, 1] == "N80":
+        self.comboBox_7.setCurrentText("N80")
+    else:
+        self.comboBox_7.setCurrentText("P110")
+    self.doubleSpinBox_52.setValue(rows.iloc[39, 1])
+    self.doubleSpinBox_55.setValue(rows.iloc[38, 1])
+
+
+def load_field_map(self, rows, selections):
+    """open_excel_file 中按字段映射加载的实现"""
+    table = window.align_input_table(rows.iloc[:, 0], rows.iloc[:, 1:].to_numpy())
+    for selector in window.select_fields(selections):
+        keys, values, combos = window.extract_fields(selector, table)
+        for key, value in zip(keys, values[:, 0]):
+            getattr(self, window.FIELD_WIDGETS[key]).setValue(value)
+        for key, texts in combos:
+            getattr(self, window.FIELD_WIDGETS[key]).setCurrentText(texts[0])
+
+
+@pytest.mark.parametrize("well_type, wear_model, formation, known_text", list(itertools.product(
+    ["气井数据", "油井数据"], ["套管磨损面积(线性关系)", "套管磨损面积(几何关系)"], ["非塑性蠕变地层", "塑性蠕变地层"],
+    [True, False])))
+def test_field_map_matches_baseline_assignments(well_type, wear_model, formation, known_text):
+    rows = make_rows(known_text)
+    selections = {"well_type": well_type, "wear_model": wear_model,
+                  "environment": "硫化氢或二氧化碳腐蚀环境", "formation": formation}
+    expected, actual = Window(), Window()
+
+    load_baseline(expected, rows, selections)
+    load_field_map(actual, rows, selections)
+
+    assert actual.widgets == expected.widgets
+
+
+def test_extract_fields_loads_every_well_column():
+    first, second = make_rows(True), make_rows(False)
+    second["值"] = [value * 2 if not isinstance(value, str) else value for value in second["值"]]
+    table = pd.concat([first, second["值"]], axis=1).iloc[:, 1:].to_numpy()
+    selector = next(window.select_fields({"well_type": "气井数据"}))
+
+    names, values, combos = window.extract_fields(selector, table)
+
+    assert values.shape == (len(names), 2)
+    assert (values[:, 1] == values[:, 0] * 2).all()
+    assert dict(combos)[("Gas_well_ablation_model", "F")] == ["圆形", "角形"]
+    assert dict(combos)[("Gas_Effective_internal_pressure", "casing_type")] == ["表层套管和技术套管", "生产套管和生产尾管"]
+
+
+def test_rows_are_found_by_parameter_label():
+    standard = with_labels(make_rows(True))
+    shuffled = standard.sample(frac=1, random_state=0)
+    selections = {"well_type": "油井数据", "wear_model": "套管磨损面积(线性关系)", "formation": "塑性蠕变地层"}
+    expected, actual = Window(), Window()
+
+    load_field_map(expected, standard, selections)
+    load_field_map(actual, shuffled, selections)
+
+    assert actual.widgets == expected.widgets
+
+
+def test_model_fields_name_known_parameters_and_widgets():
+    for _, branches in window.MODEL_FIELD_MAP:
+        for fields in branches.values():
+            for label, model, param, _ in fields:
+                assert label in window.INPUT_PARAMETERS
+                assert (model, param) in window.FIELD_WIDGETS
+
+
+def test_read_input_table_aligns_rows_by_label(tmp_path):
+    pytest.importorskip("openpyxl")
+    rows = with_labels(make_rows(True))
+    path = tmp_path / "输入数据.xlsx"
+    rows.iloc[::-1].to_excel(path, index=False)
+
+    table = window.read_input_table(path)
+
+    assert table.shape == (50, 1)
+    for label, (row, _) in window.INPUT_PARAMETERS.items():
+        assert table[row, 0] == rows.iloc[row, 1]
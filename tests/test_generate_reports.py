@@ -0,0 +1,122 @@
+import io
+import zipfile
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+import window  # noqa: E402
+
+
+def make_template(path):
+    template = docx.Document()
+    template.add_paragraph("最大外压力 ##MAX_EXPRESSURE## MPa，安全等级：##SAFT_LEVEL##")
+    table = template.add_table(rows=1, cols=1)
+    table.cell(0, 0).paragraphs[0].add_run("##CHART_1##")
+    for i in range(2, 5):
+        template.add_paragraph(f"##CHART_{i}##")
+    template.save(path)
+    return path
+
+
+def read_report(source):
+    doc = docx.Document(source)
+    return doc.paragraphs[0].text, len(doc.element.body.xpath(".//w:drawing")), len(doc.paragraphs)
+
+
+def results(count, result_dict):
+    return [dict(result_dict, 最大外压力=float(i), 安全等级=f"等级{i}") for i in range(count)]
+
+
+def test_compiled_template_renders_independent_reports(tmp_path, result_dict, chart_images):
+    template = window.CompiledTemplate(make_template(tmp_path / "template.docx"))
+
+    outputs = []
+    for result in results(3, result_dict):
+        output = io.BytesIO()
+        ok, message, path = template.render(result, chart_images, output)
+        assert ok, message
+        assert path is output
+        outputs.append(output)
+
+    for i, output in enumerate(outputs):
+        # 4 个占位符图表 + 1 张自动追加到文末的图表
+        assert read_report(io.BytesIO(output.getvalue())) == (f"最大外压力 {i}.00 MPa，安全等级：等级{i}", 5, 5)
+    # 模板本身不被修改
+    assert "##MAX_EXPRESSURE##" in template.document.paragraphs[0].text
+
+
+def test_compiled_template_matches_fill_template_with_results(tmp_path, result_dict, chart_images):
+    template_path = make_template(tmp_path / "template.docx")
+    expected, compiled = io.BytesIO(), io.BytesIO()
+
+    window.fill_template_with_results(template_path, result_dict, chart_images, expected)
+    window.CompiledTemplate(template_path).render(result_dict, chart_images, compiled)
+
+    assert read_report(compiled) == read_report(expected)
+
+
+def test_render_does_not_carry_images_into_later_reports(tmp_path, result_dict, chart_images):
+    template = window.CompiledTemplate(make_template(tmp_path / "template.docx"))
+    first, second = io.BytesIO(), io.BytesIO()
+
+    template.render(result_dict, chart_images, first)
+    template.render(result_dict, [chart_images[0]] * 5, second)
+
+    media = [name for name in zipfile.ZipFile(second).namelist() if name.startswith("word/media/")]
+    assert len(media) == 1
+    assert read_report(second)[1] == 5
+    assert set(template.part.rels) == template.rIds
+
+
+def test_render_reports_errors(tmp_path, result_dict):
+    template = window.CompiledTemplate(make_template(tmp_path / "template.docx"))
+
+    ok, message, path = template.render(result_dict, [], io.BytesIO())
+
+    assert not ok
+    assert message.startswith("错误：")
+    assert path is None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_reports(tmp_path, result_dict, chart_images, workers):
+    template_path = make_template(tmp_path / "template.docx")
+    result_dicts = results(4, result_dict)
+    output_paths = [str(tmp_path / f"report_{i}.docx") for i in range(4)]
+
+    reports = window.generate_reports(template_path, result_dicts, [chart_images] * 4, output_paths, workers=workers)
+
+    assert reports == [(True, "文档填充成功", path) for path in output_paths]
+    for i, path in enumerate(output_paths):
+        assert read_report(path) == (f"最大外压力 {i}.00 MPa，安全等级：等级{i}", 5, 5)
+
+
+def test_generate_reports_accepts_template_stream(tmp_path, result_dict, chart_images):
+    template_path = make_template(tmp_path / "template.docx")
+    output_paths = [str(tmp_path / f"report_{i}.docx") for i in range(2)]
+
+    with open(template_path, "rb") as template:
+        reports = window.generate_reports(template, results(2, result_dict), [chart_images] * 2, output_paths,
+                                          workers=2)
+
+    assert [ok for ok, _, _ in reports] == [True, True]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_generate_reports_accepts_chart_files_and_output_streams(tmp_path, result_dict, chart_images, workers):
+    template_path = make_template(tmp_path / "template.docx")
+    chart_files = []
+    for i, image in enumerate(chart_images):
+        path = tmp_path / f"chart_{i}.png"
+        path.write_bytes(image)
+        chart_files.append(str(path) if i % 2 else io.BytesIO(image))
+    outputs = [io.BytesIO() for _ in range(2)]
+
+    reports = window.generate_reports(template_path, results(2, result_dict), [chart_files] * 2, outputs,
+                                      workers=workers)
+
+    assert reports == [(True, "文档填充成功", output) for output in outputs]
+    for i, output in enumerate(outputs):
+        output.seek(0)
+        assert read_report(output) == (f"最大外压力 {i}.00 MPa，安全等级：等级{i}", 5, 5)
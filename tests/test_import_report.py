@@ -0,0 +1,9 @@
+import window
+
+
+def test_import_time_report_lists_failed_imports():
+    report = window.import_time_report(["json", "casing_no_such_module"]).splitlines()
+
+    assert report[0].split() == ["模块", "耗时(ms)"]
+    assert any(line.split()[0] == "numpy" for line in report[1:])
+    assert report[-1].split()[:2] == ["casing_no_such_module", "导入失败"]
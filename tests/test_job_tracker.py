@@ -0,0 +1,87 @@
+import threading
+
+import window
+
+GAS = "gas_well_ablation_graph"
+
+
+def test_same_name_job_supersedes_previous_one():
+    jobs = window.JobTracker()
+    first = jobs.start(GAS, window.CancelToken())
+    second = jobs.start(GAS, window.CancelToken())
+
+    assert first.cancelled and not second.cancelled
+    assert not jobs.finish(GAS, first)
+    assert jobs.finish(GAS, second)
+    assert GAS not in jobs
+
+
+def test_cancelled_job_result_is_never_applied():
+    jobs = window.JobTracker()
+    token = jobs.start(GAS, window.CancelToken())
+    started, release = threading.Event(), threading.Event()
+    outcome = []
+
+    def compute(token):
+        started.set()
+        release.wait(5)
+        return "结果"  # 已取消但没有再调用 check() 的计算也会算完
+
+    def on_finished(result):
+        if jobs.finish(GAS, token):
+            outcome.append(result)
+
+    worker = threading.Thread(target=window.run_job, args=(compute, token, on_finished, outcome.append))
+    worker.start()
+    assert started.wait(5)
+    jobs.cancel(GAS)
+    release.set()
+    worker.join(5)
+
+    assert outcome == []
+    assert len(jobs) == 0
+
+
+def test_result_delivered_after_cancel_is_discarded():
+    jobs = window.JobTracker()
+    token = jobs.start(GAS, window.CancelToken())
+    delivered = []
+    window.run_job(lambda token: "结果", token, delivered.append, delivered.append)
+
+    jobs.cancel(GAS)  # 结果已发出、尚未在界面线程中处理时取消
+
+    assert delivered == ["结果"]
+    assert not jobs.finish(GAS, token)
+
+
+def test_failed_stage_drops_pending_failure_check():
+    jobs = window.JobTracker()
+    graph = window.StageGraph(dict.fromkeys(["冲蚀速率"]))
+    token = jobs.start(GAS, window.CancelToken())
+    graph.request_final("all")
+    assert not graph.take_final(busy=GAS in jobs, pressures_ready=True)
+
+    errors = []
+
+    def compute(token):
+        raise ValueError("参数错误")
+
+    window.run_job(compute, token, None, errors.append)
+
+    assert errors == ["参数错误"]
+    assert jobs.finish(GAS, token)
+    assert graph.stage_failed(GAS) == "all"
+    assert graph.final_request is None
+    assert graph.stage_failed("export") is None
+
+
+def test_progress_is_slowest_job():
+    jobs = window.JobTracker()
+    assert jobs.progress() is None
+
+    jobs.start("a", window.CancelToken()).check(30, 100)
+    jobs.start("b", window.CancelToken()).check(70, 100)
+
+    assert jobs.progress() == 30
+    jobs.cancel_all()
+    assert jobs.progress() is None
@@ -0,0 +1,86 @@
+import numpy as np
+
+import window
+
+
+class Model:
+    """记录构造次数的计算模型替身"""
+
+    calls = 0
+
+    def __init__(self, **params):
+        type(self).calls += 1
+        self.params = params
+
+
+def make_cache(maxsize=16):
+    Model.calls = 0
+    return window.ModelCache(maxsize)
+
+
+def test_repeated_parameters_are_answered_from_cache():
+    cache = make_cache()
+
+    first = cache.get(Model, h=1000.0, casing_type="生产套管和生产尾管")
+    second = cache.get(Model, h=1000.0, casing_type="生产套管和生产尾管")
+
+    assert second is first
+    assert Model.calls == 1
+    assert cache.cache_info() == window.CacheInfo(hits=1, misses=1, maxsize=16, currsize=1)
+
+
+def test_keys_are_canonicalized():
+    cache = make_cache()
+
+    cache.get(Model, T=60, material="碳钢", pH=4.0)
+    cache.get(Model, pH=np.float64(4.0), T=60.0, material=" 碳钢 ")
+    cache.get(Model, T=np.linspace(0, 120, 3)[1], material="碳钢", pH=4.0000000000001)
+
+    assert Model.calls == 1
+    assert cache.hits == 2
+
+
+def test_different_strings_are_different_entries():
+    cache = make_cache()
+
+    cache.get(Model, h=1000.0, casing_type="表层套管和技术套管")
+    cache.get(Model, h=1000.0, casing_type="生产套管和生产尾管")
+    cache.get(Model, T=60.0, material="1Cr")
+    cache.get(Model, T=60.0, material="3Cr")
+
+    assert Model.calls == 4
+    assert cache.misses == 4
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(maxsize=2)
+
+    cache.get(Model, h=1.0)
+    cache.get(Model, h=2.0)
+    cache.get(Model, h=1.0)  # h=1 变为最近使用
+    cache.get(Model, h=3.0)  # 淘汰 h=2
+    cache.get(Model, h=1.0)
+    cache.get(Model, h=2.0)
+
+    assert Model.calls == 4
+    assert cache.cache_info().currsize == 2
+
+
+def test_unhashable_parameters_are_not_cached():
+    cache = make_cache()
+
+    cache.get(Model, d_c=np.zeros(3))
+    cache.get(Model, d_c=np.zeros(3))
+
+    assert Model.calls == 2
+    assert cache.cache_info().currsize == 0
+
+
+def test_clear_resets_entries_and_stats():
+    cache = make_cache()
+    cache.get(Model, h=1.0)
+    cache.get(Model, h=1.0)
+
+    cache.clear()
+
+    assert cache.cache_info() == window.CacheInfo(0, 0, 16, 0)
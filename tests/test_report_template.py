@@ -0,0 +1,137 @@
+import io
+
+import pytest
+
+docx = pytest.importorskip("docx")
+
+import window  # noqa: E402
+
+
+def drawings(element):
+    return element.xpath(".//w:drawing")
+
+
+def fill(doc, result_dict, chart_images):
+    index = window.index_placeholders(doc)
+    window.fill_placeholders(doc, index, result_dict, chart_images)
+    return index
+
+
+def test_text_placeholder_split_across_runs_keeps_first_run_format(result_dict, chart_images):
+    doc = docx.Document()
+    paragraph = doc.add_paragraph("最大内压力：")
+    first = paragraph.add_run("##MAX_IN")
+    first.bold = True
+    second = paragraph.add_run("PRESSURE## MPa")
+    second.italic = True
+
+    fill(doc, result_dict, chart_images)
+
+    assert paragraph.text == "最大内压力：12.35 MPa"
+    assert first.text == "12.35"
+    assert first.bold and not first.italic
+    assert second.text == " MPa"
+
+
+def test_placeholders_in_same_run_are_all_replaced(result_dict, chart_images):
+    doc = docx.Document()
+    paragraph = doc.add_paragraph("##MAX_EXPRESSURE## / ##MAX_INPRESSURE## / ##SAFT_LEVEL##")
+
+    fill(doc, result_dict, chart_images)
+
+    assert paragraph.text == "45.68 / 12.35 / 安全"
+
+
+def test_chart_placeholder_inside_table_cell(result_dict, chart_images):
+    doc = docx.Document()
+    table = doc.add_table(rows=1, cols=2)
+    cell = table.cell(0, 1)
+    cell.paragraphs[0].add_run("图1：##CHART_1##（冲蚀）")
+    body_paragraphs = len(doc.paragraphs)
+
+    fill(doc, result_dict, chart_images)
+
+    runs = cell.paragraphs[0].runs
+    assert [run.text for run in runs] == ["图1：", "", "（冲蚀）"]
+    assert len(drawings(runs[1]._r)) == 1
+    assert len(drawings(cell._tc)) == 1
+    # 只有未找到占位符的 4 张图表追加到文末
+    assert len(doc.paragraphs) == body_paragraphs + 4
+
+
+def test_merged_cell_is_visited_once(result_dict, chart_images):
+    doc = docx.Document()
+    table = doc.add_table(rows=2, cols=2)
+    merged = table.cell(0, 0).merge(table.cell(1, 1))
+    merged.paragraphs[0].add_run("等级：##SAFT_LEVEL## ##CHART_2##")
+
+    index = fill(doc, result_dict, chart_images)
+
+    assert len(index) == 1
+    assert merged.paragraphs[0].text == "等级：安全 "
+    assert len(drawings(table._tbl)) == 1
+
+
+def test_missing_chart_placeholders_are_appended(result_dict, chart_images):
+    doc = docx.Document()
+    doc.add_paragraph("##CHART_3##")
+    body_paragraphs = len(doc.paragraphs)
+
+    fill(doc, result_dict, chart_images)
+
+    appended = doc.paragraphs[body_paragraphs:]
+    assert [paragraph.text for paragraph in appended] == [
+        f"（自动添加的图表 {i}，未找到对应占位符）" for i in (1, 2, 4, 5)]
+    assert all(len(drawings(paragraph._p)) == 1 for paragraph in appended)
+    assert len(drawings(doc.paragraphs[0]._p)) == 1
+
+
+def test_fill_template_with_results_round_trip(tmp_path, result_dict, chart_images):
+    template_path = tmp_path / "template.docx"
+    template = docx.Document()
+    template.add_paragraph("冲蚀速率 ##ABLATION_VELOCITY##，腐蚀速率 ##CORROSION_VELOCITY##")
+    for i in range(1, 6):
+        template.add_paragraph(f"##CHART_{i}##")
+    template.save(template_path)
+
+    output = io.BytesIO()
+    ok, message, path = window.fill_template_with_results(template_path, result_dict, chart_images, output)
+
+    assert ok, message
+    assert path is output
+    doc = docx.Document(io.BytesIO(output.getvalue()))
+    assert doc.paragraphs[0].text == "冲蚀速率 0.123，腐蚀速率 0.0032"
+    assert len(drawings(doc.element.body)) == 5
+    assert "##" not in "".join(paragraph.text for paragraph in doc.paragraphs)
+
+
+def test_chart_only_template_needs_no_text_results(tmp_path, chart_images):
+    template_path = tmp_path / "template.docx"
+    template = docx.Document()
+    template.add_paragraph("##CHART_1##")
+    template.save(template_path)
+
+    output = io.BytesIO()
+    ok, message, _ = window.fill_template_with_results(template_path, {}, chart_images, output)
+
+    assert ok, message
+    assert len(drawings(docx.Document(io.BytesIO(output.getvalue())).element.body)) == 5
+
+
+def test_uncalculated_results_are_marked(result_dict, chart_images):
+    doc = docx.Document()
+    paragraph = doc.add_paragraph("##CORROSION_VELOCITY## / ##MAX_EXPRESSURE##")
+    result_dict["长期腐蚀速率"] = None
+    del result_dict["最大外压力"]
+
+    fill(doc, result_dict, chart_images)
+
+    assert paragraph.text == "未计算 / 未计算"
+
+
+def test_fill_template_with_results_reports_errors(tmp_path, chart_images):
+    ok, message, path = window.fill_template_with_results(tmp_path / "missing.docx", {}, chart_images, io.BytesIO())
+
+    assert not ok
+    assert message.startswith("错误：")
+    assert path is None
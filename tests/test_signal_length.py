@@ -0,0 +1,12 @@
+import pytest
+
+import window
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("200", 200), ("1e5", 100000), (50, 50),
+    ("1", 2), ("-10", 2), ("5000000", 1000000),
+    ("abc", 50), ("", 50), (None, 50), ("inf", 50), ("nan", 50),
+])
+def test_clamp_signal_length(value, expected):
+    assert window.clamp_signal_length(value) == expected
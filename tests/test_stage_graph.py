@@ -0,0 +1,131 @@
+import window
+
+GAS = "gas_well_ablation_graph"
+OIL = "oil_well_ablation_graph"
+WEAR = "wear_model_line_graph"
+CORRODE = "corrode_model_graph"
+EXTERNAL = "noplasticity_effective_external_squeeze_pressure_graph"
+INTERNAL = "gas_effective_internal_pressure_graph"
+FINAL = window.FINAL_STAGE
+
+
+def calculated_graph():
+    """气井工况下各环节及失效判定都已算完"""
+    results = dict.fromkeys(["冲蚀速率", "长期腐蚀速率", "最大外压力", "最大内压力", "剩余抗外挤强度", "剩余抗内挤强度"], 1.0)
+    results["安全等级"] = "安全"
+    graph = window.StageGraph(results)
+    for stage in (GAS, WEAR, CORRODE, EXTERNAL, INTERNAL):
+        graph.done(stage)
+    graph.done(FINAL)
+    return graph
+
+
+def test_editing_inactive_alternative_keeps_failure_check():
+    graph = calculated_graph()
+
+    cleared = graph.invalidate(OIL)
+
+    assert cleared == ["lineEdit_10"]
+    assert FINAL not in graph.stale
+    assert graph.results["冲蚀速率"] == 1.0
+    assert graph.stale_sources() == []
+
+
+def test_editing_source_stage_clears_its_results_and_failure_check():
+    graph = calculated_graph()
+
+    cleared = graph.invalidate(GAS)
+
+    assert cleared == ["lineEdit_9", "lineEdit", "lineEdit_2", "lineEdit_3"]
+    assert graph.results["冲蚀速率"] is None
+    assert graph.results["安全等级"] is None
+    assert graph.results["长期腐蚀速率"] == 1.0
+    assert FINAL in graph.stale
+
+
+def test_calculate_all_reruns_only_stale_sources():
+    graph = calculated_graph()
+    graph.invalidate(OIL)
+    graph.invalidate(CORRODE)
+
+    assert graph.stale_sources() == [CORRODE]
+    assert graph.stale_sources(running={CORRODE}) == []
+
+
+def test_last_calculated_alternative_becomes_the_source():
+    graph = calculated_graph()
+    graph.done(OIL)
+
+    graph.invalidate(GAS)
+
+    assert graph.sources["d_c"] == OIL
+    assert graph.results["冲蚀速率"] == 1.0
+    assert graph.stale_sources() == []
+
+
+def test_final_never_runs_on_stale_sources():
+    graph = calculated_graph()
+    graph.invalidate(GAS)
+
+    graph.request_final("all")
+
+    assert not graph.take_final(busy=False, pressures_ready=True)
+    assert graph.final_request is None
+
+
+def test_final_waits_until_sources_are_recalculated():
+    graph = calculated_graph()
+    graph.invalidate(GAS)
+    graph.request_final("all")
+
+    assert not graph.take_final(busy=True, pressures_ready=True)
+    assert graph.final_request == "all"
+
+    graph.done(GAS)
+    assert graph.take_final(busy=False, pressures_ready=False)
+
+
+def test_live_request_needs_pressures_and_does_not_replace_all():
+    graph = calculated_graph()
+    graph.invalidate(CORRODE)
+    graph.done(CORRODE)
+
+    graph.request_final("live")
+    assert not graph.take_final(busy=False, pressures_ready=False)
+
+    graph.request_final("all")
+    graph.request_final("live")
+    assert graph.final_request == "all"
+    assert graph.drop_final() == "all"
+    assert not graph.take_final(busy=False, pressures_ready=True)
+
+
+def test_live_edits_are_coalesced_per_stage():
+    graph = calculated_graph()
+    for _ in range(5):
+        graph.edited(GAS, live=True)
+    graph.edited(CORRODE, live=True)
+
+    assert graph.take_pending() == [GAS, CORRODE]
+    assert graph.pending == set()
+    assert graph.take_pending() == [GAS, CORRODE]  # 仍过期的来源环节
+
+
+def test_edits_outside_live_mode_are_not_pending():
+    graph = calculated_graph()
+
+    graph.edited(OIL)
+
+    assert graph.pending == set()
+    assert OIL in graph.stale
+
+
+def test_pending_skips_recalculated_stages_and_running_sources():
+    graph = calculated_graph()
+    graph.edited(OIL, live=True)
+    graph.edited(CORRODE, live=True)
+    graph.edited(WEAR)
+    graph.edited(INTERNAL)
+    graph.done(CORRODE)  # 防抖期间已通过按钮重算
+
+    assert graph.take_pending(running={INTERNAL}) == [OIL, WEAR]
@@ -0,0 +1,35 @@
+import json
+
+import window
+
+
+def test_trace_stage_is_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr(window, "_TRACE_PATH", None)
+    monkeypatch.setattr(window, "_trace_events", [])
+
+    with window.trace_stage("sweep", 50):
+        pass
+
+    assert window.trace_stage("sweep") is window._NO_TRACE
+    assert window._trace_events == []
+
+
+def test_export_trace_writes_chrome_trace(monkeypatch, tmp_path):
+    monkeypatch.setattr(window, "_TRACE_PATH", str(tmp_path / "trace.json"))
+    monkeypatch.setattr(window, "_trace_events", [])
+
+    with window.trace_stage("model_eval"):
+        pass
+    with window.trace_stage("sweep", 50):
+        pass
+    window.export_trace(window._TRACE_PATH)
+
+    with open(window._TRACE_PATH, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert [(event["name"], event["ph"], event["args"]["items"]) for event in events] == [
+        ("model_eval", "X", None), ("sweep", "X", 50)]
+    assert all(event["dur"] >= 0 for event in events)
+
+    summary = window.trace_summary().splitlines()
+    assert len(summary) == 3
+    assert summary[1].split()[:2] in (["model_eval", "1"], ["sweep", "1"])
@@ -1,51 +1,1108 @@
-from PyQt5.Qt import *
-from PyQt5.uic import loadUi
-
-import numpy as np
+import atexit
+import bisect
+import collections
+import contextlib
+import copy
+import functools
+import hashlib
+import importlib
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
 
-import pandas as pd
+_startup_begin = time.perf_counter()
 
-from docx import Document
-from docx.shared import Inches
+import numpy as np
 
-import matplotlib.pyplot as plt
+# pandas / python-docx / matplotlib 导入较慢，改为在首次使用时由 _lazy_import 导入。
+# 注意：界面文件中的 MplWidget 本身是 matplotlib 画布，loadUi 构造主窗口时
+# 就会导入 matplotlib 和 Qt5Agg 后端，延迟导入只对 pandas / python-docx 及不构造窗口的调用方有效
+_DEFERRED_MODULES = ("pandas", "docx", "matplotlib", "matplotlib.backends.backend_qt5agg")
 
-from matplotlib.backends.backend_qt5agg import (NavigationToolbar2QT as NavigationToolbar)  # 导入导航栏
-from matplotlib.backend_bases import Event
+# 记录各模块导入耗时（秒），用于启动耗时报告
+_import_times = {"numpy": time.perf_counter() - _startup_begin}
 
+# from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+# from PyQt5.QtGui import QIcon
+# from PyQt5.QtWidgets import (QAction, QComboBox, QDialog, QFileDialog, QHBoxLayout, QInputDialog, QLabel, QMainWindow,
+#                              QMessageBox, QProgressBar, QPushButton, QVBoxLayout)
+# from PyQt5.uic import loadUi
+#
 # import calculate_model as cm
 #
 # from help_window import open_help_window
 
-import os
+
+# 阶段耗时记录（可选）：设置环境变量 CASING_TRACE=<输出文件> 后开启，
+# 退出时导出 Chrome trace（可用 chrome://tracing 或 Perfetto 打开）并打印汇总表
+_TRACE_PATH = os.environ.get("CASING_TRACE")
+_trace_events = []  # (阶段名, 开始时间, 墙钟时间, CPU 时间, 条目数, 线程号)
+_NO_TRACE = contextlib.nullcontext()
+
+
+class _StageTimer:
+    """记录一个阶段的墙钟时间、CPU 时间和处理条目数"""
+
+    __slots__ = ("name", "items", "start", "cpu_start")
+
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        _trace_events.append((self.name, self.start, time.perf_counter() - self.start,
+                              time.thread_time() - self.cpu_start, self.items, threading.get_ident()))
+        return False
+
+
+def trace_stage(name, items=None):
+    """记录阶段耗时的上下文管理器；未开启记录时返回空操作对象，几乎没有开销"""
+    if _TRACE_PATH is None:
+        return _NO_TRACE
+    return _StageTimer(name, items)
+
+
+def traced(func):
+    """记录槽函数整体耗时的装饰器；未开启记录时原样返回函数"""
+    if _TRACE_PATH is None:
+        return func
+
+    # 包装函数只接收 self，避免 clicked 等信号把 checked 参数传给槽函数
+    @functools.wraps(func)
+    def wrapper(self):
+        with _StageTimer(func.__name__, None):
+            return func(self)
+    return wrapper
+
+
+def trace_summary():
+    """返回各阶段耗时汇总表（按总墙钟时间降序）"""
+    totals = {}
+    for name, _, wall, cpu, items, _ in _trace_events:
+        count, wall_sum, cpu_sum, item_sum = totals.get(name, (0, 0.0, 0.0, 0))
+        totals[name] = (count + 1, wall_sum + wall, cpu_sum + cpu, item_sum + (items or 0))
+
+    lines = [f"{'阶段':<40}{'次数':>6}{'墙钟(ms)':>12}{'CPU(ms)':>12}{'条目数':>10}"]
+    for name, (count, wall, cpu, items) in sorted(totals.items(), key=lambda item: item[1][1], reverse=True):
+        lines.append(f"{name:<40}{count:>6}{wall * 1000:>12.1f}{cpu * 1000:>12.1f}{items:>10}")
+    return "\n".join(lines)
+
+
+def export_trace(path):
+    """将已记录的阶段耗时导出为 Chrome trace JSON 文件"""
+    events = [{"name": name, "ph": "X", "ts": (start - _startup_begin) * 1e6, "dur": wall * 1e6,
+               "pid": os.getpid(), "tid": tid, "args": {"cpu_ms": cpu * 1000, "items": items}}
+              for name, start, wall, cpu, items, tid in _trace_events]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events}, f, ensure_ascii=False)
+
+
+def _write_trace():
+    """程序退出时导出阶段耗时记录并打印汇总表"""
+    export_trace(_TRACE_PATH)
+    print(trace_summary())
+
+
+if _TRACE_PATH is not None:
+    atexit.register(_write_trace)
+
+
+def _lazy_import(name):
+    """按需导入模块，并记录首次导入的耗时"""
+    module = sys.modules.get(name)
+    if module is None:
+        with trace_stage(f"import {name}"):
+            start = time.perf_counter()
+            module = importlib.import_module(name)
+            _import_times[name] = time.perf_counter() - start
+    return module
+
+
+def import_time_report(modules=()):
+    """
+    返回各模块导入耗时的文本报告（毫秒，按耗时降序）
+
+    modules 中尚未导入的模块会先导入再统计，导入失败的模块（如未安装 PyQt5 时的 Qt5Agg 后端）列在最后
+    """
+    failures = []
+    for name in modules:
+        try:
+            _lazy_import(name)
+        except ImportError as e:
+            failures.append(f"{name:<40}{'导入失败':>10}  {e}")
+
+    lines = [f"{'模块':<40}{'耗时(ms)':>10}"]
+    for name, seconds in sorted(_import_times.items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"{name:<40}{seconds * 1000:>10.1f}")
+    return "\n".join(lines + failures)
+
+
+def chart_image_stream(image):
+    """将图表图片（bytes、文件对象或路径）转换为 add_picture 可直接读取的对象"""
+    if isinstance(image, (bytes, bytearray)):
+        return io.BytesIO(image)
+    return image
+
+
+# 文本占位符 -> (计算结果字典的键, 数值格式)
+TEXT_PLACEHOLDERS = {
+    "##ABLATION_VELOCITY##": ("冲蚀速率", ".3f"),
+    "##CORROSION_VELOCITY##": ("长期腐蚀速率", ".4f"),
+    "##MAX_EXPRESSURE##": ("最大外压力", ".2f"),
+    "##MAX_INPRESSURE##": ("最大内压力", ".2f"),
+    "##RESI_EXRESISTANCE_EXTRUSION##": ("剩余抗外挤强度", ".2f"),
+    "##RESI_INRESISTANCE_EXTRUSION##": ("剩余抗内挤强度", ".2f"),
+    "##SAFT_LEVEL##": ("安全等级", ""),
+}
+
+# 图表占位符 -> 图表序号（从 0 开始）
+CHART_PLACEHOLDERS = {f"##CHART_{i}##": i - 1 for i in range(1, 6)}
+
+PLACEHOLDER_PATTERN = re.compile(r"##[A-Z0-9_]+##")
+
+
+def iter_paragraphs(container):
+    """遍历正文及表格（含嵌套表格）中的所有段落"""
+    yield from container.paragraphs
+    for table in container.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                yield from iter_paragraphs(cell)
+
+
+def index_placeholders(doc):
+    """
+    遍历一次模板，建立占位符在 run 级别的位置索引
+
+    返回 [(段落, runs, locations), ...]，locations 中每项为
+    (占位符, 起始 run 序号, 起始 run 内偏移, 结束 run 序号, 结束 run 内偏移)
+    """
+    index = []
+    seen = set()  # 合并单元格会在 row.cells 中重复出现
+    for paragraph in iter_paragraphs(doc):
+        if paragraph._p in seen:
+            continue
+        seen.add(paragraph._p)
+
+        runs = paragraph.runs
+        texts = [run.text for run in runs]
+        text = "".join(texts)
+        if "##" not in text:
+            continue
+
+        starts = []  # 每个 run 在段落文本中的起始位置
+        position = 0
+        for run_text in texts:
+            starts.append(position)
+            position += len(run_text)
+
+        locations = []
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            placeholder = match.group()
+            if placeholder not in TEXT_PLACEHOLDERS and placeholder not in CHART_PLACEHOLDERS:
+                continue
+            first = bisect.bisect_right(starts, match.start()) - 1
+            last = bisect.bisect_right(starts, match.end() - 1) - 1
+            locations.append((placeholder, first, match.start() - starts[first], last, match.end() - starts[last]))
+        if locations:
+            index.append((paragraph, runs, locations))
+    return index
+
+
+def replace_run_text(runs, first, start, last, end, value):
+    """将跨 run 的占位符替换为 value，替换后的文本沿用首个 run 的格式"""
+    if first == last:
+        run = runs[first]
+        run.text = run.text[:start] + value + run.text[end:]
+        return run
+    runs[first].text = runs[first].text[:start] + value
+    for run in runs[first + 1:last]:
+        run.text = ""
+    runs[last].text = runs[last].text[end:]
+    return runs[first]
+
+
+def fill_placeholders(doc, index, result_dict, chart_path):
+    """按占位符索引一次性填充文本和图表，同一段落内从后往前替换以保证偏移有效"""
+    Inches = _lazy_import("docx.shared").Inches
+
+    found_charts = set()
+
+    for paragraph, runs, locations in index:
+        for placeholder, first, start, last, end in reversed(locations):
+            if placeholder in TEXT_PLACEHOLDERS:
+                # 只格式化模板中出现的占位符；尚未计算的结果（缺失或为 None）填为“未计算”
+                key, spec = TEXT_PLACEHOLDERS[placeholder]
+                value = result_dict.get(key)
+                replace_run_text(runs, first, start, last, end, "未计算" if value is None else format(value, spec))
+                continue
+
+            # 清空占位符文本，并在原位置插入对应图片
+            chart_index = CHART_PLACEHOLDERS[placeholder]
+            run = replace_run_text(runs, first, start, last, end, "")
+            tail_text = run.text[start:]
+            if tail_text:  # 占位符位于 run 中间时拆分 run，图片插在两段文本之间
+                run.text = run.text[:start]
+                tail_r = copy.deepcopy(run._r)
+                run._r.addnext(tail_r)
+                type(run)(tail_r, paragraph).text = tail_text
+            picture_run = paragraph.add_run()
+            run._r.addnext(picture_run._r)
+            picture_run.add_picture(chart_image_stream(chart_path[chart_index]), width=Inches(3.5))
+            found_charts.add(chart_index)
+
+    # 没找到占位符的图表，在文档末尾添加
+    for chart_index in sorted(set(CHART_PLACEHOLDERS.values()) - found_charts):
+        new_paragraph = doc.add_paragraph()
+        new_paragraph.add_run().add_picture(chart_image_stream(chart_path[chart_index]), width=Inches(6))
+        # 可选：添加提示文本
+        new_paragraph.add_run(f"（自动添加的图表 {chart_index + 1}，未找到对应占位符）")
+
+
+def fill_template_with_results(template_path, result_dict, chart_path, output_path):
+    """
+    使用计算结果填充Word模板
+
+    参数:
+    template_path: 模板文件路径或文件对象
+    result_dict: 计算结果字典
+    chart_path: 图表图片列表，元素为 PNG 字节、文件对象或文件路径
+    output_path: 输出文件路径或文件对象（如 BytesIO）
+    """
+    try:
+        # 打开模板文档
+        with trace_stage("template_open"):
+            doc = _lazy_import("docx").Document(template_path)
+
+        with trace_stage("template_index"):
+            index = index_placeholders(doc)
+        with trace_stage("template_fill", len(index)):
+            fill_placeholders(doc, index, result_dict, chart_path)
+
+        # 保存填充后的文档
+        with trace_stage("template_save"):
+            doc.save(output_path)
+        return True, "文档填充成功", output_path
+
+    except Exception as e:
+        return False, f"错误：{str(e)}", None
+
+
+class CompiledTemplate:
+    """
+    预编译的Word模板
+
+    模板只读取、解析一次并建立占位符索引，用于为多口井批量生成报告。
+    每份报告只复制正文部件（document.xml），页眉页脚、样式及已添加的图片部件在各份报告间共用，
+    因此同一个 CompiledTemplate 不能在多个线程中同时 render。
+    """
+
+    def __init__(self, template_path):
+        self.document = _lazy_import("docx").Document(template_path)
+        self.part = self.document.part
+        self.element = self.part.element  # 未填充的正文，每份报告从它复制
+        self.rIds = set(self.part.rels)  # 模板自带的关系，生成报告时新增的图片关系用完即删除
+
+        # 在副本上建立索引，self.document 保持刚解析的状态：
+        # python-docx 会缓存正文代理对象，复制后这些缓存会指向脱离文档的节点
+        doc = self._copy()
+
+        # 记录占位符段落在正文全部段落中的序号，复制文档后按序号定位
+        positions = {p: i for i, p in enumerate(self._paragraphs(doc))}
+        self.index = [(positions[paragraph._p], locations)
+                      for paragraph, runs, locations in index_placeholders(doc)]
+
+    def _copy(self):
+        """复制正文部件，返回绑定到模板部件的新文档对象"""
+        return _lazy_import("docx.document").Document(copy.deepcopy(self.element), self.part)
+
+    @staticmethod
+    def _paragraphs(doc):
+        return list(doc.element.body.iter(_lazy_import("docx.oxml.ns").qn("w:p")))
+
+    def render(self, result_dict, chart_path, output_path):
+        """生成一份报告，参数和返回值与 fill_template_with_results 相同"""
+        Paragraph = _lazy_import("docx.text.paragraph").Paragraph
+
+        try:
+            with trace_stage("template_copy"):
+                doc = self._copy()
+            self.part._element = doc.element  # 保存时序列化的是部件当前的正文
+
+            paragraphs = self._paragraphs(doc)
+            index = []
+            for position, locations in self.index:
+                paragraph = Paragraph(paragraphs[position], doc)
+                index.append((paragraph, paragraph.runs, locations))
+
+            with trace_stage("template_fill", len(index)):
+                fill_placeholders(doc, index, result_dict, chart_path)
+
+            with trace_stage("template_save"):
+                doc.save(output_path)
+            return True, "文档填充成功", output_path
+
+        except Exception as e:
+            return False, f"错误：{str(e)}", None
+
+        finally:
+            # 恢复未填充的正文，并删除本份报告新增的图片关系；图片部件保留在包中，
+            # 后续报告插入相同图片时直接复用（按 SHA1 查找），没有关系指向的部件不会被保存
+            self.part._element = self.element
+            for rId in set(self.part.rels) - self.rIds:
+                self.part.drop_rel(rId)
+
+
+def chart_image_bytes(image):
+    """将图表图片（bytes、文件对象或路径）读取为 bytes，文件对象从头读取（与 add_picture 一致）"""
+    if isinstance(image, (bytes, bytearray)):
+        return bytes(image)
+    if hasattr(image, "read"):
+        image.seek(0)
+        return image.read()
+    with open(image, "rb") as f:
+        return f.read()
+
+
+_worker_template = None  # 报告生成子进程中的预编译模板
+_worker_images = None  # 报告生成子进程中的图表图片（按 SHA1 去重）
+
+
+def _init_report_worker(template_bytes, images):
+    """报告生成子进程初始化：每个进程只编译一次模板"""
+    global _worker_template, _worker_images
+    _worker_template = CompiledTemplate(io.BytesIO(template_bytes))
+    _worker_images = images
+
+
+def _render_report(result_dict, chart_digests, output_path):
+    """
+    在子进程中生成一份报告
+
+    output_path 为 None 表示调用方传入的是文件对象：报告生成到内存中，以 bytes 返回给主进程写入
+    """
+    charts = [_worker_images[digest] for digest in chart_digests]
+    if output_path is not None:
+        return _worker_template.render(result_dict, charts, output_path)
+
+    buffer = io.BytesIO()
+    ok, message, _ = _worker_template.render(result_dict, charts, buffer)
+    return ok, message, buffer.getvalue() if ok else None
+
+
+def generate_reports(template_path, result_dicts, chart_paths, output_paths, workers=1):
+    """
+    使用同一个模板批量生成报告
+
+    参数:
+    template_path: 模板文件路径或文件对象
+    result_dicts: 每份报告的计算结果字典
+    chart_paths: 每份报告的图表图片列表，元素为 PNG 字节、文件对象或文件路径
+    output_paths: 每份报告的输出文件路径或文件对象（如 BytesIO）
+    workers: 进程数，大于 1 时分配到多个进程生成
+
+    返回每份报告的 (是否成功, 提示信息, 输出路径)，顺序与输入一致
+    """
+    if workers <= 1:
+        template = CompiledTemplate(template_path)
+        return [template.render(result_dict, charts, output_path)
+                for result_dict, charts, output_path in zip(result_dicts, chart_paths, output_paths)]
+
+    if hasattr(template_path, "read"):
+        template_bytes = template_path.read()
+    else:
+        with open(template_path, "rb") as f:
+            template_bytes = f.read()
+
+    # 图表图片统一读取为 bytes，相同的图片只向子进程传递一次
+    images = {}
+    chart_digests = []
+    for charts in chart_paths:
+        digests = []
+        for image in charts:
+            data = chart_image_bytes(image)
+            digest = hashlib.sha1(data).hexdigest()
+            images.setdefault(digest, data)
+            digests.append(digest)
+        chart_digests.append(digests)
+
+    # 文件对象不能跨进程写入：子进程返回报告内容，由主进程写入调用方的文件对象
+    worker_outputs = [None if hasattr(output, "write") else output for output in output_paths]
+
+    futures = _lazy_import("concurrent.futures")
+    with futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_report_worker,
+                                     initargs=(template_bytes, images)) as executor:
+        reports = list(executor.map(_render_report, result_dicts, chart_digests, worker_outputs))
+
+    for i, (output, (ok, message, data)) in enumerate(zip(output_paths, reports)):
+        if ok and hasattr(output, "write"):
+            output.write(data)
+            reports[i] = (ok, message, output)
+    return reports
+
+
+# Excel 输入表（第 0 列为参数名，第 1 列起每列一口井）的参数：参数名 -> (标准输入表中的行号, 单位)
+# 读取时按参数名查找所在行，表中找不到该参数名时按标准输入表的行号读取
+INPUT_PARAMETERS = {
+    "气体流速": (0, "m/s"),
+    "砂的流量": (1, ""),
+    "冲蚀角度": (2, "°"),
+    "砂粒形状": (3, ""),
+    "气井冲蚀参数p": (4, ""),
+    "管道横截面积": (5, "m²"),
+    "冲蚀时间": (6, ""),
+    "颗粒直径": (7, ""),
+    "粒子撞击速度": (8, "m/s"),
+    "目标材料密度": (9, ""),
+    "液体混合物密度": (10, ""),
+    "摩擦系数": (11, ""),
+    "转速": (12, ""),
+    "磨损系数": (13, ""),
+    "钻杆接头外径": (14, ""),
+    "磨损段长度": (15, ""),
+    "机械钻速": (16, "m/h"),
+    "套管半径": (17, ""),
+    "套管材质": (18, ""),
+    "温度": (19, "℃"),
+    "二氧化碳分压": (20, "MPa"),
+    "硫化氢分压": (21, "MPa"),
+    "氯离子浓度": (22, ""),
+    "pH值": (23, ""),
+    "腐蚀时间": (24, ""),
+    "套管类型": (25, ""),
+    "掏空系数": (27, ""),
+    "最小钻井液密度": (28, ""),
+    "地层水密度": (29, ""),
+    "计算点深度": (30, "m"),
+    "泊松比": (31, ""),
+    "最大钻井液密度": (32, ""),
+    "天然气密度": (33, ""),
+    "套管下深": (34, "m"),
+    "地层压力": (35, "MPa"),
+    "压力梯度": (36, ""),
+    "套管钢级": (37, ""),
+    "套管壁厚": (38, "mm"),
+    "套管外径": (39, "mm"),
+    "气柱高度": (40, "m"),
+    "轴向力": (41, ""),
+    "方位角变化": (42, ""),
+    "井斜角变化": (43, ""),
+    "井斜角": (44, "°"),
+    "钻杆线重": (45, ""),
+    "钻杆长度": (46, ""),
+}
+
+# 下拉框取值：表格中的文本属于前几项时直接使用，否则取最后一项
+SHAPES = ("圆形", "半圆形", "角形")
+CASING_TYPES = ("表层套管和技术套管", "生产套管和生产尾管")
+MATERIALS = ("碳钢", "1Cr", "3Cr")
+CASING_GRADES = ("N80", "P110")
+
+# 输入参数到计算模型参数的映射，按顺序加载
+# 每组为 (ExcelDataSelector 选择项, {选择结果: 字段列表})，选择项为 None 表示总是加载，
+# 选择结果为 None 表示其余取值；字段为 (参数名, 计算模型, 模型参数, 换算系数或下拉框取值)，
+# 计算模型为 None 的字段不参与计算，只在界面中显示
+MODEL_FIELD_MAP = [
+    ("well_type", {
+        "气井数据": [
+            # 冲蚀数据
+            ("气体流速", "Gas_well_ablation_model", "v", 1),
+            ("砂的流量", "Gas_well_ablation_model", "m", 1),
+            ("冲蚀角度", "Gas_well_ablation_model", "a", 1),
+            ("砂粒形状", "Gas_well_ablation_model", "F", SHAPES),  # 计算时按形状换算为形状系数
+            ("气井冲蚀参数p", "Gas_well_ablation_model", "p", 1),
+            ("管道横截面积", "Gas_well_ablation_model", "s", 1),
+            ("冲蚀时间", "Gas_well_ablation_model", "t", 1),
+            # 最大内压力数据
+            ("套管类型", "Gas_Effective_internal_pressure", "casing_type", CASING_TYPES),
+            ("最大钻井液密度", "Gas_Effective_internal_pressure", "rho_max", 1),
+            ("天然气密度", "Gas_Effective_internal_pressure", "rho_g", 1),
+            ("计算点深度", "Gas_Effective_internal_pressure", "h", 1),
+            ("气柱高度", "Gas_Effective_internal_pressure", "H_mg", 1),
+            ("套管下深", "Gas_Effective_internal_pressure", "H_s", 1),
+            ("地层压力", "Gas_Effective_internal_pressure", "p_p", 1),
+        ],
+        None: [  # 油井数据
+            # 冲蚀数据
+            ("砂的流量", "Oil_well_ablation_model", "m_p", 1),
+            ("颗粒直径", "Oil_well_ablation_model", "dp", 1),
+            ("冲蚀时间", "Oil_well_ablation_model", "t_c", 1),
+            ("冲蚀角度", "Oil_well_ablation_model", "alpha", 1),
+            ("粒子撞击速度", "Oil_well_ablation_model", "U_p", 1),
+            ("目标材料密度", "Oil_well_ablation_model", "rho_t", 1),
+            ("管道横截面积", "Oil_well_ablation_model", "A_pipe", 1),
+            ("液体混合物密度", "Oil_well_ablation_model", "rho_m", 1),
+            # 最大内压力数据
+            ("套管类型", "Oil_Effective_internal_squeeze_pressure", "casing_type", CASING_TYPES),
+            ("最大钻井液密度", "Oil_Effective_internal_squeeze_pressure", "rho_max", 1),
+            ("地层水密度", "Oil_Effective_internal_squeeze_pressure", "rho_w", 1),
+            ("压力梯度", "Oil_Effective_internal_squeeze_pressure", "G", 1),
+            ("计算点深度", "Oil_Effective_internal_squeeze_pressure", "h", 1),
+            ("套管下深", "Oil_Effective_internal_squeeze_pressure", "H_s", 1),
+        ],
+    }),
+    ("wear_model", {
+        "套管磨损面积(线性关系)": [
+            ("摩擦系数", "Wear_model_line", "mu", 1),
+            ("转速", "Wear_model_line", "n", 1),
+            ("磨损系数", "Wear_model_line", "f_w", 1),
+            ("钻杆接头外径", "Wear_model_line", "D", 1),
+            ("磨损段长度", "Wear_model_line", "L_m", 1),
+            ("机械钻速", "Wear_model_line", "v_rop", 1),
+            ("套管外径", "Wear_model_line", "Rc", 0.5),
+            ("轴向力", "Wear_model_line", "F_ax", 1),
+            ("方位角变化", "Wear_model_line", "delta_phi", 1),
+            ("井斜角变化", "Wear_model_line", "delta_alpha", 1),
+            ("井斜角", "Wear_model_line", "alpha", 1),
+            ("钻杆线重", "Wear_model_line", "W_dp", 1),
+            ("钻杆长度", "Wear_model_line", "L_dp", 1),
+        ],
+        None: [  # 几何关系：沿用原实现，接头半径和套管半径填入线性模型的同名输入框
+            ("钻杆接头外径", "Wear_model_line", "delta_phi", 0.5),
+            ("套管半径", "Wear_model_line", "Rc", 1),
+        ],
+    }),
+    (None, {
+        None: [  # 腐蚀环境
+            ("套管材质", "corrode_model", "material", MATERIALS),
+            ("温度", "corrode_model", "T", 1),
+            ("二氧化碳分压", "corrode_model", "P_co2", 1),
+            ("硫化氢分压", "corrode_model", "P_h2s", 1),
+            ("氯离子浓度", "corrode_model", "Cl", 1),
+            ("pH值", "corrode_model", "pH", 1),
+            ("腐蚀时间", "corrode_model", "t", 1),
+        ],
+    }),
+    ("formation", {
+        "非塑性蠕变地层": [
+            ("套管类型", "NoPlasticity_Effective_external_squeeze_pressure", "casing_type", CASING_TYPES),
+            # 沿用原实现：rho_m 与腐蚀时间读取同一行
+            ("腐蚀时间", "NoPlasticity_Effective_external_squeeze_pressure", "rho_m", 1),
+            ("掏空系数", "NoPlasticity_Effective_external_squeeze_pressure", "k_m", 1),
+            ("最小钻井液密度", "NoPlasticity_Effective_external_squeeze_pressure", "rho_min", 1),
+            ("地层水密度", "NoPlasticity_Effective_external_squeeze_pressure", "rho_w", 1),
+            ("计算点深度", "NoPlasticity_Effective_external_squeeze_pressure", "h", 1),
+        ],
+        None: [  # 塑性蠕变地层
+            ("套管类型", "Plasticity_Effective_external_squeeze_pressure", "casing_type", CASING_TYPES),
+            ("最小钻井液密度", "Plasticity_Effective_external_squeeze_pressure", "rho_min", 1),
+            ("地层水密度", "Plasticity_Effective_external_squeeze_pressure", "rho_w", 1),
+            ("掏空系数", "Plasticity_Effective_external_squeeze_pressure", "k_m", 1),
+            ("泊松比", "Plasticity_Effective_external_squeeze_pressure", "v", 1),
+            ("计算点深度", "Plasticity_Effective_external_squeeze_pressure", "h", 1),
+        ],
+    }),
+    (None, {
+        None: [  # 失效判定
+            ("冲蚀时间", None, "冲蚀时间", 1),
+            ("腐蚀时间", None, "腐蚀时间", 1),
+            ("套管钢级", "Effective_internal_pressure_failure_condition", "Y_p", CASING_GRADES),  # 按钢级换算屈服强度
+            ("套管外径", "Effective_internal_pressure_failure_condition", "D", 1),
+            ("套管壁厚", "Effective_internal_pressure_failure_condition", "d", 1),
+        ],
+    }),
+]
+
+# (计算模型, 模型参数) -> 界面输入控件，只在将参数填入主窗口时使用
+FIELD_WIDGETS = {
+    ("Gas_well_ablation_model", "v"): "doubleSpinBox_3",
+    ("Gas_well_ablation_model", "m"): "doubleSpinBox_2",
+    ("Gas_well_ablation_model", "a"): "doubleSpinBox_5",
+    ("Gas_well_ablation_model", "F"): "comboBox",
+    ("Gas_well_ablation_model", "p"): "doubleSpinBox_67",
+    ("Gas_well_ablation_model", "s"): "doubleSpinBox_68",
+    ("Gas_well_ablation_model", "t"): "doubleSpinBox_69",
+    ("Gas_Effective_internal_pressure", "casing_type"): "comboBox_3",
+    ("Gas_Effective_internal_pressure", "rho_max"): "doubleSpinBox_36",
+    ("Gas_Effective_internal_pressure", "rho_g"): "doubleSpinBox_40",
+    ("Gas_Effective_internal_pressure", "h"): "doubleSpinBox_39",
+    ("Gas_Effective_internal_pressure", "H_mg"): "doubleSpinBox_41",
+    ("Gas_Effective_internal_pressure", "H_s"): "doubleSpinBox_37",
+    ("Gas_Effective_internal_pressure", "p_p"): "doubleSpinBox_38",
+    ("Oil_well_ablation_model", "m_p"): "doubleSpinBox_8",
+    ("Oil_well_ablation_model", "dp"): "doubleSpinBox_64",
+    ("Oil_well_ablation_model", "t_c"): "doubleSpinBox_12",
+    ("Oil_well_ablation_model", "alpha"): "doubleSpinBox_13",
+    ("Oil_well_ablation_model", "U_p"): "doubleSpinBox_20",
+    ("Oil_well_ablation_model", "rho_t"): "doubleSpinBox_19",
+    ("Oil_well_ablation_model", "A_pipe"): "doubleSpinBox_17",
+    ("Oil_well_ablation_model", "rho_m"): "doubleSpinBox_21",
+    ("Oil_Effective_internal_squeeze_pressure", "casing_type"): "comboBox_4",
+    ("Oil_Effective_internal_squeeze_pressure", "rho_max"): "doubleSpinBox_42",
+    ("Oil_Effective_internal_squeeze_pressure", "rho_w"): "doubleSpinBox_46",
+    ("Oil_Effective_internal_squeeze_pressure", "G"): "doubleSpinBox_47",
+    ("Oil_Effective_internal_squeeze_pressure", "h"): "doubleSpinBox_43",
+    ("Oil_Effective_internal_squeeze_pressure", "H_s"): "doubleSpinBox_44",
+    ("Wear_model_line", "mu"): "doubleSpinBox_26",
+    ("Wear_model_line", "n"): "doubleSpinBox_27",
+    ("Wear_model_line", "f_w"): "doubleSpinBox_25",
+    ("Wear_model_line", "D"): "doubleSpinBox_24",
+    ("Wear_model_line", "L_m"): "doubleSpinBox_22",
+    ("Wear_model_line", "v_rop"): "doubleSpinBox_23",
+    ("Wear_model_line", "Rc"): "doubleSpinBox_30",
+    ("Wear_model_line", "F_ax"): "doubleSpinBox_71",
+    ("Wear_model_line", "delta_phi"): "doubleSpinBox_28",
+    ("Wear_model_line", "delta_alpha"): "doubleSpinBox_29",
+    ("Wear_model_line", "alpha"): "doubleSpinBox_45",
+    ("Wear_model_line", "W_dp"): "doubleSpinBox_49",
+    ("Wear_model_line", "L_dp"): "doubleSpinBox_50",
+    # 沿用原实现：材质写入 comboBox，腐蚀计算读取的是 comboBox_2
+    ("corrode_model", "material"): "comboBox",
+    ("corrode_model", "T"): "doubleSpinBox",
+    ("corrode_model", "P_co2"): "doubleSpinBox_32",
+    ("corrode_model", "P_h2s"): "doubleSpinBox_34",
+    ("corrode_model", "Cl"): "doubleSpinBox_33",
+    ("corrode_model", "pH"): "doubleSpinBox_35",
+    ("corrode_model", "t"): "doubleSpinBox_54",
+    ("NoPlasticity_Effective_external_squeeze_pressure", "casing_type"): "comboBox_5",
+    ("NoPlasticity_Effective_external_squeeze_pressure", "rho_m"): "doubleSpinBox_56",
+    ("NoPlasticity_Effective_external_squeeze_pressure", "k_m"): "doubleSpinBox_57",
+    ("NoPlasticity_Effective_external_squeeze_pressure", "rho_min"): "doubleSpinBox_59",
+    ("NoPlasticity_Effective_external_squeeze_pressure", "rho_w"): "doubleSpinBox_65",
+    ("NoPlasticity_Effective_external_squeeze_pressure", "h"): "doubleSpinBox_58",
+    ("Plasticity_Effective_external_squeeze_pressure", "casing_type"): "comboBox_6",
+    ("Plasticity_Effective_external_squeeze_pressure", "rho_min"): "doubleSpinBox_60",
+    ("Plasticity_Effective_external_squeeze_pressure", "rho_w"): "doubleSpinBox_66",
+    ("Plasticity_Effective_external_squeeze_pressure", "k_m"): "doubleSpinBox_62",
+    ("Plasticity_Effective_external_squeeze_pressure", "v"): "doubleSpinBox_63",
+    ("Plasticity_Effective_external_squeeze_pressure", "h"): "doubleSpinBox_61",
+    (None, "冲蚀时间"): "doubleSpinBox_48",
+    (None, "腐蚀时间"): "doubleSpinBox_51",
+    ("Effective_internal_pressure_failure_condition", "Y_p"): "comboBox_7",
+    ("Effective_internal_pressure_failure_condition", "D"): "doubleSpinBox_52",
+    ("Effective_internal_pressure_failure_condition", "d"): "doubleSpinBox_55",
+}
+
+
+def align_input_table(labels, table):
+    """
+    按参数名把参数表的行调整为标准输入表的行顺序
+
+    labels 为第 0 列的参数名，table 为其余各列（行为参数，列为井）；
+    找不到的参数名保留标准行号处的行
+    """
+    positions = {str(label).strip(): i for i, label in enumerate(labels)}
+    order = np.arange(len(table))
+    for label, (row, _) in INPUT_PARAMETERS.items():
+        position = positions.get(label)
+        if position is not None and row < len(order):
+            order[row] = position
+    return table[order]
+
+
+def read_input_table(path):
+    """
+    读取 Excel 输入表，返回按标准输入表行顺序排列的参数表（行为参数，列为井）
+
+    只读取用到的参数名、参数值两列和前 50 行，xlsx 按行流式解析，读满后即停止，不解析整个工作簿
+    """
+    with trace_stage("excel_read", 50):
+        df = _lazy_import("pandas").read_excel(path, usecols=[0, 1], nrows=50)
+    return align_input_table(df.iloc[:, 0], df.iloc[:, 1:].to_numpy())
+
+
+def compile_field_map(field_map):
+    """
+    将字段映射编译为列选择器：[(选择项, {选择结果: 选择器}), ...]
+
+    选择器为 (数值行号数组, 数值参数列表, 换算系数数组, 下拉框字段)，参数为 (计算模型, 模型参数)，
+    下拉框字段为 (行号, 参数, 取值)；数值参数可按行号数组一次从参数表中取出。
+    """
+    compiled = []
+    for key, branches in field_map:
+        selectors = {}
+        for value, fields in branches.items():
+            numeric = [field for field in fields if not isinstance(field[3], tuple)]
+            selectors[value] = (
+                np.array([INPUT_PARAMETERS[label][0] for label, _, _, _ in numeric], dtype=int),
+                [(model, param) for _, model, param, _ in numeric],
+                np.array([scale for _, _, _, scale in numeric], dtype=float),
+                [(INPUT_PARAMETERS[label][0], (model, param), choices)
+                 for label, model, param, choices in fields if isinstance(choices, tuple)],
+            )
+        compiled.append((key, selectors))
+    return compiled
+
+
+EXCEL_FIELDS = compile_field_map(MODEL_FIELD_MAP)
+
+
+def select_fields(selections):
+    """按 ExcelDataSelector 的选择结果，依次返回要加载的字段选择器"""
+    for key, selectors in EXCEL_FIELDS:
+        value = selections[key] if key is not None else None
+        yield selectors.get(value, selectors.get(None))
+
+
+def extract_fields(selector, table):
+    """
+    从参数表（行为参数，列为井，行顺序同标准输入表）中一次取出选择器对应的全部参数
+
+    返回 (数值参数列表, 数值矩阵（参数 × 井）, [(下拉框参数, 各井取值), ...])，参数为 (计算模型, 模型参数)
+    """
+    rows, keys, scales, combo_fields = selector
+    values = table[rows].astype(float) * scales[:, None]
+    combos = [(key, [text if text in choices[:-1] else choices[-1] for text in table[row]])
+              for row, key, choices in combo_fields]
+    return keys, values, combos
+
+
+SIGNAL_LENGTH_RANGE = (2, 1000000)  # 曲线计算点数的允许范围
+SLOW_SIGNAL_LENGTH = 10000  # 曲线逐点调用计算模型，点数超过该值时提示计算耗时
+
+
+def clamp_signal_length(value, default=50):
+    """将曲线计算点数转换为整数并限制在允许范围内，无法转换时返回 default"""
+    try:
+        length = int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return default
+    low, high = SIGNAL_LENGTH_RANGE
+    return min(max(length, low), high)
+
+
+# 曲线计算点数的默认值，可用环境变量 CASING_SIGNAL_LENGTH 修改，界面中可通过菜单调整
+SIGNAL_LENGTH = clamp_signal_length(os.environ.get("CASING_SIGNAL_LENGTH", 50))
+
+
+def decimate_minmax(x, y, max_points=2000):
+    """
+    最小-最大抽稀：曲线点数超过 max_points 时，分段只保留每段的最小值和最大值点
+
+    只用于绘图，峰值不会被抽掉；计算结果仍应取自完整数据。
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(y) <= max_points:
+        return x, y
+
+    bins = max_points // 2
+    size = len(y) // bins
+    blocks = y[:size * bins].reshape(bins, size)
+    offsets = np.arange(bins) * size
+    index = [[0, len(y) - 1], offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)]
+
+    # 不能整除时剩余的尾段
+    tail = y[size * bins:]
+    if len(tail):
+        index.append([size * bins + tail.argmin(), size * bins + tail.argmax()])
+
+    index = np.unique(np.concatenate(index))
+    return x[index], y[index]
+
+
+class JobCancelled(Exception):
+    """后台计算已被取消"""
+
+
+class CancelToken:
+    """
+    后台计算的取消标记
+
+    cancel() 可在任意线程调用；计算循环中调用 check()，已取消时抛出 JobCancelled 中止计算，
+    进度百分比变化时调用 on_progress(百分比)。
+    """
+
+    def __init__(self, on_progress=None):
+        self._cancelled = threading.Event()
+        self.on_progress = on_progress
+        self.percent = 0
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self, done=0, total=0):
+        """检查是否已取消，并报告已完成 done / total 的进度"""
+        if self._cancelled.is_set():
+            raise JobCancelled
+        if total:
+            percent = done * 100 // total
+            if percent != self.percent:
+                self.percent = percent
+                if self.on_progress is not None:
+                    self.on_progress(percent)
+
+
+def run_job(compute, token, on_finished, on_failed):
+    """
+    在后台线程中运行 compute(token)，完成时调用 on_finished(结果)，出错时调用 on_failed(错误信息)
+
+    已取消的任务既不报告结果也不报告错误
+    """
+    try:
+        result = compute(token)
+    except JobCancelled:
+        return
+    except Exception as e:
+        if not token.cancelled:
+            on_failed(str(e))
+        return
+    if not token.cancelled:
+        on_finished(result)
+
+
+class JobTracker:
+    """
+    正在运行的后台任务登记：任务名（环节名或 "export"）-> 取消标记
+
+    同名任务只保留最后提交的一个，提交新任务或取消时旧任务的取消标记被设置。任务结束时用 finish()
+    确认它仍是同名任务中最新的一个，否则其结果或错误已经过时，应直接丢弃。
+    """
+
+    def __init__(self):
+        self.tokens = {}
+
+    def start(self, name, token):
+        """登记新任务，同名任务正在运行时先取消"""
+        self.cancel(name)
+        self.tokens[name] = token
+        return token
+
+    def cancel(self, name):
+        """取消任务，返回是否有任务被取消"""
+        token = self.tokens.pop(name, None)
+        if token is None:
+            return False
+        token.cancel()
+        return True
+
+    def cancel_all(self):
+        for name in list(self.tokens):
+            self.cancel(name)
+
+    def finish(self, name, token):
+        """任务结束（完成或出错）：仍是最新的同名任务时注销并返回 True，已被取消或取代时返回 False"""
+        if self.tokens.get(name) is not token:
+            return False
+        del self.tokens[name]
+        return True
+
+    def progress(self):
+        """正在运行的任务中最慢的进度百分比，没有任务时返回 None"""
+        return min((token.percent for token in self.tokens.values()), default=None)
+
+    def __contains__(self, name):
+        return name in self.tokens
+
+    def __iter__(self):
+        return iter(list(self.tokens))
+
+    def __len__(self):
+        return len(self.tokens)
+
+
+def canonical_value(value):
+    """将模型参数规范化为缓存键：数值统一为 12 位有效数字的 float，字符串去掉首尾空白"""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.number)):
+        return float(format(float(value), ".12g")) + 0.0  # + 0.0 将 -0.0 规范为 0.0
+    return value
+
+
+CacheInfo = collections.namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class ModelCache:
+    """
+    计算模型的缓存（LRU）
+
+    以 (模型类, 规范化后的参数) 为键缓存构造好的模型对象，超过 maxsize 项时淘汰最久未使用的一项。
+    模型对象在多次调用间共用，调用方只能读取其属性；可在多个线程中同时使用。
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model, **params):
+        """返回 model(**params)，参数相同（规范化后）时直接返回缓存的对象"""
+        key = (model, tuple(sorted((name, canonical_value(value)) for name, value in params.items())))
+        try:
+            hash(key)
+        except TypeError:  # 参数中有数组等不可哈希的值时不缓存
+            return model(**params)
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = model(**params)  # 在锁外计算，其他线程不必等待
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+# 主窗口各计算环节共用的模型缓存：重复点击、批量计算中参数相同的井及曲线上重复的点不再重新计算
+MODEL_CACHE = ModelCache()
+
+
+# 评估计算环节（槽函数名）-> (输出量, 对应的报告结果键, 结果显示控件名, 输入控件名)
+ASSESSMENT_STAGES = {
+    "gas_well_ablation_graph": ("d_c", ["冲蚀速率"], ["lineEdit_9"], [
+        "comboBox", "doubleSpinBox_2", "doubleSpinBox_5", "doubleSpinBox_67", "doubleSpinBox_68",
+        "doubleSpinBox_69", "doubleSpinBox_3"]),
+    "oil_well_ablation_graph": ("d_c", ["冲蚀速率"], ["lineEdit_10"], [
+        "doubleSpinBox_8", "doubleSpinBox_20", "doubleSpinBox_19", "doubleSpinBox_17", "doubleSpinBox_13",
+        "doubleSpinBox_21", "doubleSpinBox_64", "doubleSpinBox_12"]),
+    "wear_model_line_graph": ("d_m", [], [], [
+        "doubleSpinBox_26", "doubleSpinBox_27", "doubleSpinBox_25", "doubleSpinBox_24", "doubleSpinBox_22",
+        "doubleSpinBox_23", "doubleSpinBox_30", "doubleSpinBox_71", "doubleSpinBox_28", "doubleSpinBox_29",
+        "doubleSpinBox_45", "doubleSpinBox_49", "doubleSpinBox_50"]),
+    "corrode_model_graph": ("d_f", ["长期腐蚀速率"], ["lineEdit_8"], [
+        "doubleSpinBox", "doubleSpinBox_32", "doubleSpinBox_34", "doubleSpinBox_33", "doubleSpinBox_35",
+        "comboBox_2", "doubleSpinBox_54"]),
+    "noplasticity_effective_external_squeeze_pressure_graph": ("P_ce", ["最大外压力"], ["lineEdit_6"], [
+        "doubleSpinBox_56", "doubleSpinBox_65", "doubleSpinBox_57", "doubleSpinBox_59", "comboBox_5",
+        "doubleSpinBox_58"]),
+    "plasticity_effective_external_squeeze_pressure_graph": ("P_ce", ["最大外压力"], ["lineEdit_7"], [
+        "doubleSpinBox_62", "doubleSpinBox_60", "doubleSpinBox_66", "doubleSpinBox_61", "doubleSpinBox_63",
+        "comboBox_6"]),
+    "gas_effective_internal_pressure_graph": ("P_bh", ["最大内压力"], ["lineEdit_4"], [
+        "doubleSpinBox_36", "doubleSpinBox_37", "doubleSpinBox_38", "doubleSpinBox_40", "doubleSpinBox_39",
+        "doubleSpinBox_41", "comboBox_3"]),
+    "oil_effective_internal_squeeze_pressure_graph": ("P_bh", ["最大内压力"], ["lineEdit_5"], [
+        "doubleSpinBox_42", "doubleSpinBox_46", "doubleSpinBox_47", "doubleSpinBox_43", "doubleSpinBox_44",
+        "comboBox_4"]),
+    "effective_internal_pressure_failure_condition_calculate": (
+        None, ["剩余抗外挤强度", "剩余抗内挤强度", "安全等级"], ["lineEdit", "lineEdit_2", "lineEdit_3"], [
+            "comboBox_7", "doubleSpinBox_55", "doubleSpinBox_52"]),
+}
+
+# 最终的失效判定环节，依赖 d_c、d_m、d_f、P_ce、P_bh
+FINAL_STAGE = "effective_internal_pressure_failure_condition_calculate"
+
+
+class StageGraph:
+    """
+    评估计算环节的依赖跟踪
+
+    输入变化时只标记受影响的环节为过期，计算时只重算过期环节。某个输出量（如 d_c）由最后一次
+    算出它的环节提供，只有该来源环节过期时才清除对应的报告结果，下游失效判定也随之过期；
+    修改未被采用的另一种工况（如气井/油井）不影响已有结果。
+    """
+
+    def __init__(self, results, stages=ASSESSMENT_STAGES, final_stage=FINAL_STAGE):
+        self.stages = stages
+        self.final_stage = final_stage
+        self.results = results  # 报告结果字典，来源环节过期时对应的结果置为 None
+        self.stale = set(stages)
+        self.sources = {output: None for output, _, _, _ in stages.values() if output is not None}  # 输出量 -> 来源环节
+        self.final_request = None  # 待运行的失效判定："all"（计算按钮）或 "live"（实时计算）
+        self.pending = set()  # 实时计算模式下修改过、等待防抖结束后重算的环节
+
+    def invalidate(self, stage):
+        """标记环节过期，返回需要清空的结果显示控件名"""
+        self.stale.add(stage)
+        output, result_keys, display_names, _ = self.stages[stage]
+        cleared = list(display_names)
+        if output is not None and self.sources[output] != stage:
+            return cleared  # 当前结果不是由该环节算出的，不受影响
+
+        for key in result_keys:
+            self.results[key] = None
+        if stage != self.final_stage:
+            cleared += self.invalidate(self.final_stage)
+        return cleared
+
+    def edited(self, stage, live=False):
+        """输入控件变化：标记环节过期，实时计算模式下记为待重算；返回需要清空的结果显示控件名"""
+        if live:
+            self.pending.add(stage)
+        return self.invalidate(stage)
+
+    def take_pending(self, running=()):
+        """
+        防抖结束：返回需要重算的环节，并清空待重算记录
+
+        先是期间修改过且仍过期的环节（连续多次修改只重算一次），再是其余结果来源已过期、
+        且不在 running 中的环节
+        """
+        pending, self.pending = self.pending, set()
+        stages = [stage for stage in self.stages
+                  if stage != self.final_stage and stage in pending and stage in self.stale]
+        return stages + [stage for stage in self.stale_sources(running) if stage not in stages]
+
+    def done(self, stage):
+        """环节计算完成：记录输出量的来源，下游失效判定需重新计算；返回需要清空的结果显示控件名"""
+        self.stale.discard(stage)
+        output = self.stages[stage][0]
+        if output is None:
+            return []
+        self.sources[output] = stage
+        return self.invalidate(self.final_stage)
+
+    def stale_sources(self, running=()):
+        """结果来源已过期、且不在 running 中（没有正在后台计算）的上游环节"""
+        return [stage for stage in dict.fromkeys(self.sources.values())
+                if stage is not None and stage in self.stale and stage not in running]
+
+    def request_final(self, request):
+        """请求运行失效判定，"all" 不会被 "live" 覆盖"""
+        if self.final_request != "all":
+            self.final_request = request
+
+    def take_final(self, busy, pressures_ready):
+        """
+        上游环节都算完后取出待运行的失效判定请求，返回是否应运行失效判定
+
+        busy 表示还有上游环节在后台计算，此时请求保留到计算完成；上游结果仍有过期的不运行，
+        避免混用新旧结果。"all" 总是运行，"live" 只在外压力和内压力都已算出（pressures_ready）时运行。
+        """
+        if self.final_request is None or busy:
+            return False
+        request, self.final_request = self.final_request, None
+        if self.final_stage not in self.stale or self.stale_sources():
+            return False
+        return request == "all" or pressures_ready
+
+    def drop_final(self):
+        """放弃待运行的失效判定，返回被放弃的请求"""
+        request, self.final_request = self.final_request, None
+        return request
+
+    def stage_failed(self, name):
+        """后台任务出错：评估环节出错时放弃待运行的失效判定并返回被放弃的请求，其他任务返回 None"""
+        if name not in self.stages:
+            return None
+        return self.drop_final()
 
 
-print("Hello world!")
-print(40*"*")
-# class CustomToolbar(NavigationToolbar):  # 自定义导航栏
-#     def __init__(self, canvases, parent):
-#         self.canvases = canvases
-#         self.parent = parent
-#         self.current_canvas = canvases[0] if canvases else None
-#         NavigationToolbar.__init__(self, self.current_canvas, parent)
-#         self.setMaximumHeight(30)
-#
-#     def draw(self):
-#         if self.current_canvas:
-#             self.current_canvas.draw()
-#
-#     def update(self):
-#         if self.current_canvas:
-#             self.current_canvas.update()
-#
-#     def set_canvas(self, canvas):
-#         if canvas in self.canvases:
-#             self.current_canvas = canvas
-#             NavigationToolbar.__init__(self, self.current_canvas, self.parent, coordinates=True)
-#             self.canvas = canvas  # 更新内部的canvas属性
-#             self.update()  # 更新工具栏
-#
-#
 # class ExcelDataSelector(QDialog):
 #     """简化版Excel数据选择对话框，用于记录用户的选择条件"""
 #
@@ -126,122 +1183,44 @@ print(40*"*")
 #         }
 #
 #
-# def fill_template_with_results(template_path, result_dict, chart_path, output_path):
-#     """
-#     使用计算结果填充Word模板
-#
-#     参数:
-#     template_path: 模板文件路径
-#     result_dict: 计算结果字典
-#     chart_path: 图表图片路径
-#     output_path: 输出文件路径
-#     """
-#     try:
-#         # 打开模板文档
-#         doc = Document(template_path)
-#
-#         # 1. 填充文本结果
-#         for paragraph in doc.paragraphs:
-#             # 替换冲蚀速率
-#             if "##ABLATION_VELOCITY##" in paragraph.text:
-#                 paragraph.text = paragraph.text.replace("##ABLATION_VELOCITY##", f"{result_dict['冲蚀速率']:.3f}")
-#
-#             # 替换长期腐蚀速率
-#             if "##CORROSION_VELOCITY##" in paragraph.text:
-#                 paragraph.text = paragraph.text.replace("##CORROSION_VELOCITY##", f"{result_dict['长期腐蚀速率']:.4f}")
-#
-#             # 替换最大外压力
-#             if "##MAX_EXPRESSURE##" in paragraph.text:
-#                 paragraph.text = paragraph.text.replace("##MAX_EXPRESSURE##", f"{result_dict['最大外压力']:.2f}")
-#
-#             # 替换最大内压力
-#             if "##MAX_INPRESSURE##" in paragraph.text:
-#                 paragraph.text = paragraph.text.replace("##MAX_INPRESSURE##", f"{result_dict['最大内压力']:.2f}")
-#
-#             # 替换剩余抗外挤强度
-#             if "##RESI_EXRESISTANCE_EXTRUSION##" in paragraph.text:
-#                 paragraph.text = paragraph.text.replace("##RESI_EXRESISTANCE_EXTRUSION##", f"{result_dict['剩余抗外挤强度']:.2f}")
-#
-#             # 替换剩余抗内挤强度
-#             if "##RESI_INRESISTANCE_EXTRUSION##" in paragraph.text:
-#                 paragraph.text = paragraph.text.replace("##RESI_INRESISTANCE_EXTRUSION##", f"{result_dict['剩余抗内挤强度']:.2f}")
-#
-#             # 替换安全等级
-#             if "##SAFT_LEVEL##" in paragraph.text:
-#                 paragraph.text = paragraph.text.replace("##SAFT_LEVEL##", f"{result_dict['安全等级']}")
-#
-#         # 处理表格中的占位符
-#         for table in doc.tables:
-#             for row in table.rows:
-#                 for cell in row.cells:
-#                     for paragraph in cell.paragraphs:
-#                         # 替换冲蚀速率
-#                         if "##ABLATION_VELOCITY##" in paragraph.text:
-#                             paragraph.text = paragraph.text.replace("##ABLATION_VELOCITY##",
-#                                                                     f"{result_dict['冲蚀速率']:.3f}")
-#
-#                         # 替换长期腐蚀速率
-#                         if "##CORROSION_VELOCITY##" in paragraph.text:
-#                             paragraph.text = paragraph.text.replace("##CORROSION_VELOCITY##",
-#                                                                     f"{result_dict['长期腐蚀速率']:.4f}")
-#
-#                         # 替换最大外压力
-#                         if "##MAX_EXPRESSURE##" in paragraph.text:
-#                             paragraph.text = paragraph.text.replace("##MAX_EXPRESSURE##",
-#                                                                     f"{result_dict['最大外压力']:.2f}")
-#
-#                         # 替换最大内压力
-#                         if "##MAX_INPRESSURE##" in paragraph.text:
-#                             paragraph.text = paragraph.text.replace("##MAX_INPRESSURE##",
-#                                                                     f"{result_dict['最大内压力']:.2f}")
-#
-#                         # 替换剩余抗外挤强度
-#                         if "##RESI_EXRESISTANCE_EXTRUSION##" in paragraph.text:
-#                             paragraph.text = paragraph.text.replace("##RESI_EXRESISTANCE_EXTRUSION##",
-#                                                                     f"{result_dict['剩余抗外挤强度']:.2f}")
-#
-#                         # 替换剩余抗内挤强度
-#                         if "##RESI_INRESISTANCE_EXTRUSION##" in paragraph.text:
-#                             paragraph.text = paragraph.text.replace("##RESI_INRESISTANCE_EXTRUSION##",
-#                                                                     f"{result_dict['剩余抗内挤强度']:.2f}")
-#
-#                         # 替换安全等级
-#                         if "##SAFT_LEVEL##" in paragraph.text:
-#                             paragraph.text = paragraph.text.replace("##SAFT_LEVEL##", f"{result_dict['安全等级']}")
-#
-#         # 遍历5个图表占位符
-#         for i in range(1, 6):
-#             # 定义当前图表的占位符文本和对应的图片路径
-#             target_text = f"##CHART_{i}##"
-#
-#             # 标记是否找到占位符
-#             found = False
-#
-#             # 遍历文档段落查找占位符
-#             for paragraph in doc.paragraphs:
-#                 if target_text in paragraph.text:
-#                     # 清空占位符文本
-#                     paragraph.text = paragraph.text.replace(target_text, "")
-#                     # 插入对应图片
-#                     run = paragraph.add_run()
-#                     run.add_picture(chart_path[i - 1], width=Inches(3.5))
-#                     found = True
-#                     break  # 找到后退出段落循环
-#
-#             # 如果没找到当前占位符，可根据需求处理
-#             if not found:
-#                 # 示例：在文档末尾添加图片
-#                 new_paragraph = doc.add_paragraph()
-#                 new_paragraph.add_run().add_picture(chart_path[i - 1], width=Inches(6))
-#                 # 可选：添加提示文本
-#                 new_paragraph.add_run(f"（自动添加的图表 {i}，未找到对应占位符）")
-#
-#         # 保存填充后的文档
-#         doc.save(output_path)
-#         return True, "文档填充成功", output_path
-#
-#     except Exception as e:
-#         return False, f"错误：{str(e)}", None
+# class JobSignals(QObject):
+#     """后台任务的信号，跨线程发出后在界面线程中执行连接的槽函数"""
+#     finished = pyqtSignal(object)
+#     failed = pyqtSignal(str)
+#     progress = pyqtSignal(int)
+#
+#
+# class Job(QRunnable):
+#     """在 QThreadPool 中运行 compute(token) 的后台任务，结果和进度通过信号发回界面线程"""
+#
+#     def __init__(self, compute):
+#         super().__init__()
+#         self.compute = compute
+#         self.signals = JobSignals()
+#         self.token = CancelToken(self.signals.progress.emit)
+#
+#     def run(self):
+#         run_job(self.compute, self.token, self.signals.finished.emit, self.signals.failed.emit)
+#
+#
+# def chart_data_hash(figure):
+#     """根据图中曲线数据和标签计算哈希，用于判断图表是否需要重新渲染"""
+#     digest = hashlib.sha1(str(id(figure)).encode())
+#     for axes in figure.axes:
+#         for text in (axes.get_title(), axes.get_xlabel(), axes.get_ylabel()):
+#             digest.update(text.encode("utf-8"))
+#         for line in axes.get_lines():
+#             digest.update(np.asarray(line.get_xydata(), dtype=float).tobytes())
+#     return digest.hexdigest()
+#
+#
+# # 标签页状态 (标签页序号, 子页面序号...) -> 导航栏对应的画布在 mpl_widgets 中的序号，未列出的使用第一个画布
+# TAB_CANVASES = {
+#     (0, 0): 0, (0, 1): 3,
+#     (1,): 1,
+#     (2,): 6,
+#     (3, 0, 0): 3, (3, 0, 1): 4, (3, 1, 0): 5, (3, 1, 1): 6,
+# }
 #
 #
 # class MainWindow(QMainWindow):
@@ -268,8 +1247,10 @@ print(40*"*")
 #             self.graphicsView_3.canvas
 #         ]
 #
-#         self.toolbar = CustomToolbar(self.mpl_widgets, self)  # 添加导航栏
-#         self.addToolBar(self.toolbar)
+#         # 每个画布一个导航栏，首次显示时创建，切换标签页时只切换显示
+#         self.toolbars = {}
+#         self.toolbar = None  # 当前显示的导航栏
+#         self.show_toolbar(self.mpl_widgets[0])  # 添加导航栏
 #
 #         self.centralwidget.setContentsMargins(11, 11, 11, 11)  # 设置窗口边距
 #
@@ -281,7 +1262,7 @@ print(40*"*")
 #         self.pushButton_8.clicked.connect(self.plasticity_effective_external_squeeze_pressure_graph)
 #         self.pushButton_9.clicked.connect(self.gas_effective_internal_pressure_graph)
 #         self.pushButton_10.clicked.connect(self.oil_effective_internal_squeeze_pressure_graph)
-#         self.pushButton_11.clicked.connect(self.effective_internal_pressure_failure_condition_calculate)
+#         self.pushButton_11.clicked.connect(self.calculate_all)
 #
 #         self.actionopen.triggered.connect(self.open_excel_file)
 #         self.actionsave.triggered.connect(self.export_to_template)
@@ -289,7 +1270,7 @@ print(40*"*")
 #         self.menu_2.aboutToShow.connect(open_help_window)
 #
 #         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
+#         _lazy_import("matplotlib").rcParams['font.sans-serif'] = ['Microsoft Yahei']
 #
 #         self.widget.canvas.axes.set_xlabel('套管横截面积（m2）')  # 设置图像标签
 #         self.widget.canvas.axes.set_ylabel('侵蚀深度（mm/year）')
@@ -329,7 +1310,12 @@ print(40*"*")
 #         self.P_ce = 0  # 最大外压力
 #         self.P_bh = 0  # 最大内压力
 #
-#         self.temp_image_path = ["chart_1.png", "chart_2.png", "chart_3.png", "chart_4.png", "chart_5.png"]
+#         self.length_of_signal = SIGNAL_LENGTH  # 曲线计算点数，点数多时绘图前会抽稀
+#         self.curves = {}  # 各画布上的曲线，重复计算时只更新数据
+#
+#         self.chart_images = [None] * 5  # 报告图表的 PNG 数据（内存中，不写临时文件）
+#         self.chart_canvases = [None] * len(self.chart_images)  # 各报告图表最后一次绘制所在的画布
+#         self.chart_hashes = [None] * len(self.chart_images)  # 已渲染图片对应的图表数据哈希
 #         self.word_path = "计算结果报告.docx"
 #         self.calc_result = {
 #             "冲蚀速率": None, "长期腐蚀速率": None, "最大外压力": None,
@@ -345,33 +1331,74 @@ print(40*"*")
 #         self.toolBox_4.currentChanged.connect(self.on_tab_changed)
 #         self.toolBox_5.currentChanged.connect(self.on_tab_changed)
 #
+#         # 计算环节依赖跟踪：输入变化时只标记受影响的环节为过期，计算时只重算过期环节
+#         self.stage_graph = StageGraph(self.calc_result)
+#         for stage, (_, _, _, widget_names) in ASSESSMENT_STAGES.items():
+#             for name in widget_names:
+#                 widget = getattr(self, name)
+#                 signal = widget.currentTextChanged if isinstance(widget, QComboBox) else widget.valueChanged
+#                 signal.connect(lambda *args, stage=stage: self.on_input_changed(stage))
+#
+#         # 实时计算（可选）：输入变化后经过防抖延时再重算，连续修改只触发最后一次
+#         self.live_mode = False
+#         self.live_timer = QTimer(self)
+#         self.live_timer.setSingleShot(True)
+#         self.live_timer.setInterval(300)  # 防抖延时（毫秒）
+#         self.live_timer.timeout.connect(self.live_recalculate)
+#
+#         self.live_action = QAction("实时计算", self, checkable=True)
+#         self.live_action.toggled.connect(self.set_live_mode)
+#         self.menuBar().addAction(self.live_action)
+#
+#         self.signal_length_action = QAction("曲线计算点数...", self)
+#         self.signal_length_action.triggered.connect(self.set_signal_length)
+#         self.menuBar().addAction(self.signal_length_action)
+#
+#         # 后台计算：模型计算、曲线扫描和报告填充在线程池中进行，界面不再卡住
+#         self.thread_pool = QThreadPool.globalInstance()
+#         self.jobs = JobTracker()  # 正在运行的后台任务
+#         self.progress_bar = QProgressBar(self)
+#         self.progress_bar.setMaximumWidth(200)
+#         self.progress_bar.hide()
+#         self.statusBar().addPermanentWidget(self.progress_bar)
+#
 #     def on_tab_changed(self):
-#         """标签页切换时更新工具栏画布（增加调试信息）"""
+#         """标签页切换时显示当前画布对应的导航栏"""
 #         try:
-#             if self.tabWidget.currentIndex() == 0 and self.toolBox.currentIndex() == 0:
-#                 self.toolbar.set_canvas(self.mpl_widgets[0])
-#             elif self.tabWidget.currentIndex() == 0 and self.toolBox.currentIndex() == 1:
-#                 self.toolbar.set_canvas(self.mpl_widgets[3])
-#             elif self.tabWidget.currentIndex() == 1:
-#                 self.toolbar.set_canvas(self.mpl_widgets[1])
-#             elif self.tabWidget.currentIndex() == 2:
-#                 self.toolbar.set_canvas(self.mpl_widgets[6])
-#             elif self.tabWidget.currentIndex() == 3 and self.toolBox_4.currentIndex() == 0 and self.tabWidget_2.currentIndex() == 0:
-#                 self.toolbar.set_canvas(self.mpl_widgets[3])
-#             elif self.tabWidget.currentIndex() == 3 and self.toolBox_4.currentIndex() == 1 and self.tabWidget_2.currentIndex() == 0:
-#                 self.toolbar.set_canvas(self.mpl_widgets[4])
-#             elif self.tabWidget.currentIndex() == 3 and self.toolBox_5.currentIndex() == 0 and self.tabWidget_2.currentIndex() == 1:
-#                 self.toolbar.set_canvas(self.mpl_widgets[5])
-#             elif self.tabWidget.currentIndex() == 3 and self.toolBox_5.currentIndex() == 1 and self.tabWidget_2.currentIndex() == 1:
-#                 self.toolbar.set_canvas(self.mpl_widgets[6])
-#             else:
-#                 self.toolbar.set_canvas(self.mpl_widgets[0])
+#             canvas_index = TAB_CANVASES.get(self.current_tab_key(), 0)
+#             self.show_toolbar(self.mpl_widgets[canvas_index])
 #         except Exception as e:
 #             import logging
 #             logging.error(f"Error occurred in on_tab_changed: {e}")
-#             # 可以选择恢复默认画布或进行其他处理
-#             # self.toolbar.set_canvas(self.mpl_widgets[0])
 #
+#     def current_tab_key(self):
+#         """当前标签页状态：(标签页序号, 决定画布的子页面序号...)"""
+#         tab = self.tabWidget.currentIndex()
+#         if tab == 0:
+#             return tab, self.toolBox.currentIndex()
+#         if tab == 3:
+#             page = self.tabWidget_2.currentIndex()
+#             tool_box = self.toolBox_4 if page == 0 else self.toolBox_5
+#             return tab, page, tool_box.currentIndex()
+#         return (tab,)
+#
+#     def show_toolbar(self, canvas):
+#         """显示画布对应的导航栏并隐藏之前的导航栏，导航栏首次使用时创建并缓存"""
+#         toolbar = self.toolbars.get(canvas)
+#         if toolbar is None:
+#             NavigationToolbar = _lazy_import("matplotlib.backends.backend_qt5agg").NavigationToolbar2QT  # 导入导航栏
+#             toolbar = NavigationToolbar(canvas, self)
+#             toolbar.setMaximumHeight(30)
+#             self.addToolBar(toolbar)
+#             self.toolbars[canvas] = toolbar
+#
+#         if toolbar is not self.toolbar:
+#             if self.toolbar is not None:
+#                 self.toolbar.hide()
+#             toolbar.show()
+#             self.toolbar = toolbar
+#
+#     @traced
 #     def gas_well_ablation_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
@@ -385,7 +1412,7 @@ print(40*"*")
 #         elif self.comboBox.currentText() == '角形':
 #             F_s = 1
 #
-#         gas_well_ablation = cm.Gas_well_ablation_model(
+#         params = dict(
 #             m=self.doubleSpinBox_2.value(),
 #             F=F_s,
 #             a=self.doubleSpinBox_5.value(),
@@ -395,63 +1422,52 @@ print(40*"*")
 #             t=self.doubleSpinBox_69.value(),
 #             v=self.doubleSpinBox_3.value()
 #         )
+#         length_of_signal = self.length_of_signal
 #
-#         # 计算冲蚀壁厚
-#         self.d_c = gas_well_ablation.d_c
-#         print(f"d_c = {self.d_c} mm\n")
-#
-#         length_of_signal = 50
-#         t = np.linspace(0.01, 0.25, length_of_signal)
-#         FS_signal = []
-#         for i in range(length_of_signal):
-#             FS = cm.Gas_well_ablation_model(
-#                 m=self.doubleSpinBox_2.value(),
-#                 F=F_s,
-#                 a=self.doubleSpinBox_5.value(),
-#                 p=self.doubleSpinBox_67.value(),
-#                 s=t[i],
-#                 B=220,
-#                 t=self.doubleSpinBox_69.value(),
-#                 v=self.doubleSpinBox_3.value()
-#             )
-#             FS_signal.append(FS.E)
-#
-#         print(FS_signal)
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 gas_well_ablation = MODEL_CACHE.get(cm.Gas_well_ablation_model, **params)
 #
-#         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
-#
-#         # 清除当前图形以便绘制新的信号
-#         self.widget.canvas.axes.clear()
-#         # 绘制信号
-#         self.widget.canvas.axes.plot(t, FS_signal)
-#         # 设置x轴标签
-#         self.widget.canvas.axes.set_xlabel('管道截面面积（m2）')  # 设置图像标签
-#         # 设置y轴标签
-#         self.widget.canvas.axes.set_ylabel('侵蚀速率（mm/year）')
-#         # 设置图形标题
-#         self.widget.canvas.axes.set_title(' Tulsa angle dependent model')
+#             t = np.linspace(0.01, 0.25, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.Gas_well_ablation_model, **dict(params, s=t[i]))
+#                     FS_signal.append(FS.E)
+#             return gas_well_ablation, t, FS_signal
+#
+#         def apply(result):
+#             gas_well_ablation, t, FS_signal = result
 #
-#         # 绘制图形
-#         self.widget.canvas.draw()
+#             # 计算冲蚀壁厚
+#             self.d_c = gas_well_ablation.d_c
+#             print(f"d_c = {self.d_c} mm\n")
 #
-#         # 获取Figure对象
-#         fig = self.widget.canvas.figure
-#         # 保存为图片文件
-#         fig.savefig(self.temp_image_path[0], dpi=300, bbox_inches='tight')
+#             # 更新曲线数据并重绘
+#             self.update_curve(self.widget.canvas, *decimate_minmax(t, FS_signal),
+#                               '管道截面面积（m2）', '侵蚀速率（mm/year）', ' Tulsa angle dependent model')
 #
-#         # 显示冲蚀速率
-#         self.lineEdit_9.setText(f"{gas_well_ablation.E * 10 ** 4:.3f}")
+#             # 登记报告图表，导出时再渲染为图片
+#             self.chart_canvases[0] = self.widget.canvas
 #
-#         self.calc_result['冲蚀速率'] = gas_well_ablation.E * 10 ** 4
+#             # 显示冲蚀速率
+#             self.lineEdit_9.setText(f"{gas_well_ablation.E * 10 ** 4:.3f}")
 #
+#             self.calc_result['冲蚀速率'] = gas_well_ablation.E * 10 ** 4
+#
+#             self.stage_done("gas_well_ablation_graph")
+#
+#         self.start_job("gas_well_ablation_graph", compute, apply)
+#
+#     @traced
 #     def oil_well_ablation_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
 #
 #         """
 #         # 油井 冲蚀模型 计算
-#         oil_well_ablation = cm.Oil_well_ablation_model(
+#         params = dict(
 #             m_p=self.doubleSpinBox_8.value(),  # 砂的流量
 #             U_p=self.doubleSpinBox_20.value(),  # 粒子撞击速度
 #             rho_t=self.doubleSpinBox_19.value(),  # 目标材料密度
@@ -461,61 +1477,52 @@ print(40*"*")
 #             dp=self.doubleSpinBox_64.value(),  # 颗粒直径
 #             t_c=self.doubleSpinBox_12.value()  # 冲蚀时间
 #         )
+#         length_of_signal = self.length_of_signal
 #
-#         # 计算冲蚀壁厚
-#         self.d_c = oil_well_ablation.d_c
-#         print(f"d_c = {self.d_c} mm\n")
-#
-#         length_of_signal = 50
-#         t = np.linspace(0.01, 0.25, length_of_signal)
-#         FS_signal = []
-#         for i in range(length_of_signal):
-#             FS = cm.Oil_well_ablation_model(
-#                 m_p=self.doubleSpinBox_8.value(),  # 砂的流量
-#                 U_p=self.doubleSpinBox_20.value(),  # 粒子撞击速度
-#                 rho_t=self.doubleSpinBox_19.value(),  # 目标材料密度
-#                 A_pipe=t[i],  # 管道的横截面积
-#                 alpha=self.doubleSpinBox_13.value(),  # 冲蚀角度
-#                 rho_m=self.doubleSpinBox_21.value(),  # 液体混合物密度
-#                 dp=self.doubleSpinBox_64.value(),  # 颗粒直径
-#                 t_c=self.doubleSpinBox_12.value()  # 冲蚀时间
-#             )
-#             FS_signal.append(FS.E_cl)
-#
-#         print(FS_signal)
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 oil_well_ablation = MODEL_CACHE.get(cm.Oil_well_ablation_model, **params)
 #
-#         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
+#             t = np.linspace(0.01, 0.25, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.Oil_well_ablation_model, **dict(params, A_pipe=t[i]))
+#                     FS_signal.append(FS.E_cl)
+#             return oil_well_ablation, t, FS_signal
+#
+#         def apply(result):
+#             oil_well_ablation, t, FS_signal = result
 #
-#         # 清除当前图形以便绘制新的信号
-#         self.widget_5.canvas.axes.clear()
-#         # 绘制信号
-#         self.widget_5.canvas.axes.plot(t, FS_signal)
-#         # 设置x轴标签
-#         self.widget_5.canvas.axes.set_xlabel('管道截面面积（m2）')  # 设置图像标签
-#         # 设置y轴标签
-#         self.widget_5.canvas.axes.set_ylabel('侵蚀速率（mm/year）')
-#         # 设置图形标题
-#         self.widget_5.canvas.axes.set_title(' 弯管冲蚀模型 ')
+#             # 计算冲蚀壁厚
+#             self.d_c = oil_well_ablation.d_c
+#             print(f"d_c = {self.d_c} mm\n")
 #
-#         # 绘制图形
-#         self.widget_5.canvas.draw()
+#             # 更新曲线数据并重绘
+#             self.update_curve(self.widget_5.canvas, *decimate_minmax(t, FS_signal),
+#                               '管道截面面积（m2）', '侵蚀速率（mm/year）', ' 弯管冲蚀模型 ')
 #
-#         # 保存为图片文件
-#         self.widget_5.canvas.figure.savefig(self.temp_image_path[0], dpi=300, bbox_inches='tight')
+#             # 登记报告图表，导出时再渲染为图片
+#             self.chart_canvases[0] = self.widget_5.canvas
 #
-#         # 显示冲蚀速率
-#         self.lineEdit_10.setText(f"{oil_well_ablation.E_cl * 10 ** 4:.3f}")
+#             # 显示冲蚀速率
+#             self.lineEdit_10.setText(f"{oil_well_ablation.E_cl * 10 ** 4:.3f}")
 #
-#         self.calc_result['冲蚀速率'] = oil_well_ablation.E_cl * 10 ** 4
+#             self.calc_result['冲蚀速率'] = oil_well_ablation.E_cl * 10 ** 4
 #
+#             self.stage_done("oil_well_ablation_graph")
+#
+#         self.start_job("oil_well_ablation_graph", compute, apply)
+#
+#     @traced
 #     def wear_model_line_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
 #
 #         """
 #         # 磨损模型
-#         wear_model_line = cm.Wear_model_line(
+#         params = dict(
 #             mu=self.doubleSpinBox_26.value(),
 #             n=self.doubleSpinBox_27.value(),
 #             f_w=self.doubleSpinBox_25.value(),
@@ -530,60 +1537,46 @@ print(40*"*")
 #             W_dp=self.doubleSpinBox_49.value(),
 #             L_dp=self.doubleSpinBox_50.value()
 #         )
+#         length_of_signal = self.length_of_signal
 #
-#         self.d_m = wear_model_line.d
-#         print(f"d_m = {self.d_m*1000} mm\n")
-#
-#         length_of_signal = 50
-#         t = np.linspace(5, 50, length_of_signal)
-#         FS_signal = []
-#         for i in range(length_of_signal):
-#             FS = cm.Wear_model_line(
-#                 mu=self.doubleSpinBox_26.value(),
-#                 n=self.doubleSpinBox_27.value(),
-#                 f_w=self.doubleSpinBox_25.value(),
-#                 D=self.doubleSpinBox_24.value(),
-#                 L_m=self.doubleSpinBox_22.value(),
-#                 Rc=self.doubleSpinBox_30.value(),
-#                 F_ax=self.doubleSpinBox_71.value(),
-#                 delta_phi=self.doubleSpinBox_28.value(),
-#                 delta_alpha=self.doubleSpinBox_29.value(),
-#                 alpha=self.doubleSpinBox_45.value(),
-#                 W_dp=self.doubleSpinBox_49.value(),
-#                 L_dp=self.doubleSpinBox_50.value(),
-#                 v_rop=t[i]
-#             )
-#             FS_signal.append(FS.S)
-#
-#         print(FS_signal)
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 wear_model_line = MODEL_CACHE.get(cm.Wear_model_line, **params)
 #
-#         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
+#             t = np.linspace(5, 50, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.Wear_model_line, **dict(params, v_rop=t[i]))
+#                     FS_signal.append(FS.S)
+#             return wear_model_line, t, FS_signal
 #
-#         # 清除当前图形以便绘制新的信号
-#         self.widget_2.canvas.axes.clear()
-#         # 绘制信号
-#         self.widget_2.canvas.axes.plot(t, FS_signal)
-#         # 设置x轴标签
-#         self.widget_2.canvas.axes.set_xlabel('钻速（m/h）')  # 设置图像标签
-#         # 设置y轴标签
-#         self.widget_2.canvas.axes.set_ylabel('磨损面积（m^2）')
-#         # 设置图形标题
-#         self.widget_2.canvas.axes.set_title(' 磨损模型 ')
+#         def apply(result):
+#             wear_model_line, t, FS_signal = result
+#
+#             self.d_m = wear_model_line.d
+#             print(f"d_m = {self.d_m*1000} mm\n")
+#
+#             # 更新曲线数据并重绘
+#             self.update_curve(self.widget_2.canvas, *decimate_minmax(t, FS_signal),
+#                               '钻速（m/h）', '磨损面积（m^2）', ' 磨损模型 ')
 #
-#         # 绘制图形
-#         self.widget_2.canvas.draw()
+#             # 登记报告图表，导出时再渲染为图片
+#             self.chart_canvases[1] = self.widget_2.canvas
 #
-#         # 保存为图片文件
-#         self.widget_2.canvas.figure.savefig(self.temp_image_path[1], dpi=300, bbox_inches='tight')
+#             self.stage_done("wear_model_line_graph")
 #
+#         self.start_job("wear_model_line_graph", compute, apply)
+#
+#     @traced
 #     def corrode_model_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
 #
 #         """
 #         #  腐蚀模型
-#         corrode_model = cm.corrode_model(
+#         params = dict(
 #             T=self.doubleSpinBox.value(),
 #             P_co2=self.doubleSpinBox_32.value(),
 #             P_h2s=self.doubleSpinBox_34.value(),
@@ -592,92 +1585,57 @@ print(40*"*")
 #             material=self.comboBox_2.currentText(),
 #             t=self.doubleSpinBox_54.value()
 #         )
+#         length_of_signal = self.length_of_signal
+#
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 corrode_model = MODEL_CACHE.get(cm.corrode_model, **params)
+#
+#             t = np.linspace(0.001, 100, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.corrode_model, **dict(params, T=t[i]))
+#                     FS_signal.append(FS.R_year)
+#             return corrode_model, t, FS_signal
+#
+#         def apply(result):
+#             corrode_model, t, FS_signal = result
+#
+#             # 计算腐蚀壁厚
+#             self.d_f = corrode_model.d_f
+#             print(f"d_f = {self.d_f} mm\n")
+#
+#             if params["P_h2s"] == 0:
+#                 # 更新曲线数据并重绘
+#                 self.update_curve(self.graphicsView_3.canvas, *decimate_minmax(t, FS_signal),
+#                                   '温度（℃）', '腐蚀速率（mm/year）', '二氧化碳环境腐蚀预测模型 ')
+#             else:
+#                 # 更新曲线数据并重绘
+#                 self.update_curve(self.graphicsView_3.canvas, *decimate_minmax(t, FS_signal),
+#                                   '温度（℃）', '腐蚀速率（mm/year）', '二氧化碳与硫化氢共存环境腐蚀预测模型 ')
 #
-#         # 计算腐蚀壁厚
-#         self.d_f = corrode_model.d_f
-#         print(f"d_f = {self.d_f} mm\n")
-#
-#         length_of_signal = 50
-#         t = np.linspace(0.001, 100, length_of_signal)
-#         FS_signal = []
-#         if self.doubleSpinBox_34.value() == 0:
-#             for i in range(length_of_signal):
-#                 FS = cm.corrode_model(
-#                     T=t[i],
-#                     P_co2=self.doubleSpinBox_32.value(),
-#                     P_h2s=self.doubleSpinBox_34.value(),
-#                     Cl=self.doubleSpinBox_33.value(),
-#                     pH=self.doubleSpinBox_35.value(),
-#                     material=self.comboBox_2.currentText(),
-#                     t=self.doubleSpinBox_54.value()
-#                 )
-#                 FS_signal.append(FS.R_year)
-#
-#             print(FS_signal)
-#
-#             # 设定字体为微软雅黑
-#             plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
-#
-#             # 清除当前图形以便绘制新的信号
-#             self.graphicsView_3.canvas.axes.clear()
-#             # 绘制信号
-#             self.graphicsView_3.canvas.axes.plot(t, FS_signal)
-#             # 设置x轴标签
-#             self.graphicsView_3.canvas.axes.set_xlabel('温度（℃）')  # 设置图像标签
-#             # 设置y轴标签
-#             self.graphicsView_3.canvas.axes.set_ylabel('腐蚀速率（mm/year）')
-#             # 设置图形标题
-#             self.graphicsView_3.canvas.axes.set_title('二氧化碳环境腐蚀预测模型 ')
-#
-#             # 绘制图形
-#             self.graphicsView_3.canvas.draw()
-#         elif self.doubleSpinBox_34.value() != 0:
-#             for i in range(length_of_signal):
-#                 FS = cm.corrode_model(
-#                     T=t[i],
-#                     P_co2=self.doubleSpinBox_32.value(),
-#                     P_h2s=self.doubleSpinBox_34.value(),
-#                     Cl=self.doubleSpinBox_33.value(),
-#                     pH=self.doubleSpinBox_35.value(),
-#                     material=self.comboBox_2.currentText(),
-#                     t=self.doubleSpinBox_54.value()
-#                 )
-#                 FS_signal.append(FS.R_year)
-#
-#             print(FS_signal)
-#
-#             # 设定字体为微软雅黑
-#             plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
-#
-#             # 清除当前图形以便绘制新的信号
-#             self.graphicsView_3.canvas.axes.clear()
-#             # 绘制信号
-#             self.graphicsView_3.canvas.axes.plot(t, FS_signal)
-#             # 设置x轴标签
-#             self.graphicsView_3.canvas.axes.set_xlabel('温度（℃）')  # 设置图像标签
-#             # 设置y轴标签
-#             self.graphicsView_3.canvas.axes.set_ylabel('腐蚀速率（mm/year）')
-#             # 设置图形标题
-#             self.graphicsView_3.canvas.axes.set_title('二氧化碳与硫化氢共存环境腐蚀预测模型 ')
+#                 # 登记报告图表，导出时再渲染为图片
+#                 self.chart_canvases[2] = self.graphicsView_3.canvas
 #
-#             # 绘制图形
-#             self.graphicsView_3.canvas.draw()
+#                 # 显示长期腐蚀速率
+#                 self.lineEdit_8.setText(f"{corrode_model.R_year * 10000:.4f}")
 #
-#             # 保存为图片文件
-#             self.graphicsView_3.canvas.figure.savefig(self.temp_image_path[2], dpi=300, bbox_inches='tight')
+#                 self.calc_result['长期腐蚀速率'] = corrode_model.R_year * 10000
 #
-#             # 显示长期腐蚀速率
-#             self.lineEdit_8.setText(f"{corrode_model.R_year * 10000:.4f}")
+#             self.stage_done("corrode_model_graph")
 #
-#             self.calc_result['长期腐蚀速率'] = corrode_model.R_year * 10000
+#         self.start_job("corrode_model_graph", compute, apply)
 #
+#     @traced
 #     def noplasticity_effective_external_squeeze_pressure_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
 #
 #         """
 #         # 失效判定——非蠕变地层最大外压力
-#         self.no_plasticity_effective_external_squeeze_pressure = cm.NoPlasticity_Effective_external_squeeze_pressure(
+#         params = dict(
 #             rho_m=self.doubleSpinBox_56.value(),
 #             rho_w=self.doubleSpinBox_65.value(),
 #             k_m=self.doubleSpinBox_57.value(),
@@ -685,56 +1643,49 @@ print(40*"*")
 #             casing_type=self.comboBox_5.currentText(),
 #             h=self.doubleSpinBox_58.value()
 #         )
-#         self.P_ce = self.no_plasticity_effective_external_squeeze_pressure.p_ce
-#
-#         length_of_signal = 50
-#         t = np.linspace(1, 10000, length_of_signal)
-#         FS_signal = []
-#         for i in range(length_of_signal):
-#             FS = cm.NoPlasticity_Effective_external_squeeze_pressure(
-#                 rho_m=self.doubleSpinBox_56.value(),
-#                 rho_w=self.doubleSpinBox_65.value(),
-#                 k_m=self.doubleSpinBox_57.value(),
-#                 rho_min=self.doubleSpinBox_59.value(),
-#                 casing_type=self.comboBox_5.currentText(),
-#                 h=t[i]
-#             )
-#             FS_signal.append(FS.p_ce)
-#
-#         print(FS_signal)
+#         length_of_signal = self.length_of_signal
 #
-#         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 pressure = MODEL_CACHE.get(cm.NoPlasticity_Effective_external_squeeze_pressure, **params)
 #
-#         # 清除当前图形以便绘制新的信号
-#         self.widget_6.canvas.axes.clear()
-#         # 绘制信号
-#         self.widget_6.canvas.axes.plot(t, FS_signal)
-#         # 设置x轴标签
-#         self.widget_6.canvas.axes.set_xlabel('计算点深度（m）')  # 设置图像标签
-#         # 设置y轴标签
-#         self.widget_6.canvas.axes.set_ylabel('最大外压力（Mpa）')
-#         # 设置图形标题
-#         self.widget_6.canvas.axes.set_title(' 最大外压力模型 ')
+#             t = np.linspace(1, 10000, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.NoPlasticity_Effective_external_squeeze_pressure, **dict(params, h=t[i]))
+#                     FS_signal.append(FS.p_ce)
+#             return pressure, t, FS_signal
+#
+#         def apply(result):
+#             self.no_plasticity_effective_external_squeeze_pressure, t, FS_signal = result
+#             self.P_ce = self.no_plasticity_effective_external_squeeze_pressure.p_ce
+#
+#             # 更新曲线数据并重绘
+#             self.update_curve(self.widget_6.canvas, *decimate_minmax(t, FS_signal),
+#                               '计算点深度（m）', '最大外压力（Mpa）', ' 最大外压力模型 ')
 #
-#         # 绘制图形
-#         self.widget_6.canvas.draw()
+#             # 登记报告图表，导出时再渲染为图片
+#             self.chart_canvases[3] = self.widget_6.canvas
 #
-#         # 保存为图片文件
-#         self.widget_6.canvas.figure.savefig(self.temp_image_path[3], dpi=300, bbox_inches='tight')
+#             # 显示最大外压力
+#             self.lineEdit_6.setText(f"{self.no_plasticity_effective_external_squeeze_pressure.p_ce:.2f}")
 #
-#         # 显示最大外压力
-#         self.lineEdit_6.setText(f"{self.no_plasticity_effective_external_squeeze_pressure.p_ce:.2f}")
+#             self.calc_result['最大外压力'] = self.no_plasticity_effective_external_squeeze_pressure.p_ce
 #
-#         self.calc_result['最大外压力'] = self.no_plasticity_effective_external_squeeze_pressure.p_ce
+#             self.stage_done("noplasticity_effective_external_squeeze_pressure_graph")
 #
+#         self.start_job("noplasticity_effective_external_squeeze_pressure_graph", compute, apply)
+#
+#     @traced
 #     def plasticity_effective_external_squeeze_pressure_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
 #
 #         """
 #         # 失效判定——蠕变地层最大外压力
-#         self.plasticity_effective_external_squeeze_pressure = cm.Plasticity_Effective_external_squeeze_pressure(
+#         params = dict(
 #             k_m=self.doubleSpinBox_62.value(),
 #             rho_min=self.doubleSpinBox_60.value(),
 #             rho_w=self.doubleSpinBox_66.value(),
@@ -743,57 +1694,49 @@ print(40*"*")
 #             casing_type=self.comboBox_6.currentText(),
 #             G_v=0.023
 #         )
-#         self.P_ce = self.plasticity_effective_external_squeeze_pressure.p_ce
-#
-#         length_of_signal = 50
-#         t = np.linspace(1, 10000, length_of_signal)
-#         FS_signal = []
-#         for i in range(length_of_signal):
-#             FS = cm.Plasticity_Effective_external_squeeze_pressure(
-#                 k_m=self.doubleSpinBox_62.value(),
-#                 rho_min=self.doubleSpinBox_60.value(),
-#                 rho_w=self.doubleSpinBox_66.value(),
-#                 h=t[i],
-#                 v=self.doubleSpinBox_63.value(),
-#                 casing_type=self.comboBox_6.currentText(),
-#                 G_v=0.023
-#             )
-#             FS_signal.append(FS.p_ce)
-#
-#         print(FS_signal)
+#         length_of_signal = self.length_of_signal
 #
-#         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 pressure = MODEL_CACHE.get(cm.Plasticity_Effective_external_squeeze_pressure, **params)
 #
-#         # 清除当前图形以便绘制新的信号
-#         self.widget_7.canvas.axes.clear()
-#         # 绘制信号
-#         self.widget_7.canvas.axes.plot(t, FS_signal)
-#         # 设置x轴标签
-#         self.widget_7.canvas.axes.set_xlabel('计算点深度（m）')  # 设置图像标签
-#         # 设置y轴标签
-#         self.widget_7.canvas.axes.set_ylabel('最大外压力（Mpa）')
-#         # 设置图形标题
-#         self.widget_7.canvas.axes.set_title(' 最大外压力模型 ')
+#             t = np.linspace(1, 10000, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.Plasticity_Effective_external_squeeze_pressure, **dict(params, h=t[i]))
+#                     FS_signal.append(FS.p_ce)
+#             return pressure, t, FS_signal
+#
+#         def apply(result):
+#             self.plasticity_effective_external_squeeze_pressure, t, FS_signal = result
+#             self.P_ce = self.plasticity_effective_external_squeeze_pressure.p_ce
 #
-#         # 绘制图形
-#         self.widget_7.canvas.draw()
+#             # 更新曲线数据并重绘
+#             self.update_curve(self.widget_7.canvas, *decimate_minmax(t, FS_signal),
+#                               '计算点深度（m）', '最大外压力（Mpa）', ' 最大外压力模型 ')
 #
-#         # 保存为图片文件
-#         self.widget_7.canvas.figure.savefig(self.temp_image_path[3], dpi=300, bbox_inches='tight')
+#             # 登记报告图表，导出时再渲染为图片
+#             self.chart_canvases[3] = self.widget_7.canvas
 #
-#         # 显示最大外压力
-#         self.lineEdit_7.setText(f"{self.plasticity_effective_external_squeeze_pressure.p_ce:.2f}")
+#             # 显示最大外压力
+#             self.lineEdit_7.setText(f"{self.plasticity_effective_external_squeeze_pressure.p_ce:.2f}")
 #
-#         self.calc_result['最大外压力'] = self.plasticity_effective_external_squeeze_pressure.p_ce
+#             self.calc_result['最大外压力'] = self.plasticity_effective_external_squeeze_pressure.p_ce
 #
+#             self.stage_done("plasticity_effective_external_squeeze_pressure_graph")
+#
+#         self.start_job("plasticity_effective_external_squeeze_pressure_graph", compute, apply)
+#
+#     @traced
 #     def gas_effective_internal_pressure_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
 #
 #         """
 #         # 失效判定——气井最大内压力
-#         self.gas_Effective_internal_pressure = cm.Gas_Effective_internal_pressure(
+#         params = dict(
 #             rho_max=self.doubleSpinBox_36.value(),
 #             H_s=self.doubleSpinBox_37.value(),
 #             p_p=self.doubleSpinBox_38.value(),
@@ -802,57 +1745,49 @@ print(40*"*")
 #             H_mg=self.doubleSpinBox_41.value(),
 #             casing_type=self.comboBox_3.currentText()
 #         )
-#         self.P_bh = self.gas_Effective_internal_pressure.p_bh
-#
-#         length_of_signal = 50
-#         t = np.linspace(1, 10000, length_of_signal)
-#         FS_signal = []
-#         for i in range(length_of_signal):
-#             FS = cm.Gas_Effective_internal_pressure(
-#                 rho_max=self.doubleSpinBox_36.value(),
-#                 H_s=self.doubleSpinBox_37.value(),
-#                 p_p=self.doubleSpinBox_38.value(),
-#                 rho_g=self.doubleSpinBox_40.value(),
-#                 H_mg=self.doubleSpinBox_41.value(),
-#                 casing_type=self.comboBox_3.currentText(),
-#                 h=t[i]
-#             )
-#             FS_signal.append(FS.p_bh)
-#
-#         print(FS_signal)
+#         length_of_signal = self.length_of_signal
 #
-#         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 pressure = MODEL_CACHE.get(cm.Gas_Effective_internal_pressure, **params)
 #
-#         # 清除当前图形以便绘制新的信号
-#         self.widget_8.canvas.axes.clear()
-#         # 绘制信号
-#         self.widget_8.canvas.axes.plot(t, FS_signal)
-#         # 设置x轴标签
-#         self.widget_8.canvas.axes.set_xlabel('计算点深度（m）')  # 设置图像标签
-#         # 设置y轴标签
-#         self.widget_8.canvas.axes.set_ylabel('最大内挤压力（Mpa）')
-#         # 设置图形标题
-#         self.widget_8.canvas.axes.set_title(' 最大内挤压力模型 ')
+#             t = np.linspace(1, 10000, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.Gas_Effective_internal_pressure, **dict(params, h=t[i]))
+#                     FS_signal.append(FS.p_bh)
+#             return pressure, t, FS_signal
+#
+#         def apply(result):
+#             self.gas_Effective_internal_pressure, t, FS_signal = result
+#             self.P_bh = self.gas_Effective_internal_pressure.p_bh
 #
-#         # 绘制图形
-#         self.widget_8.canvas.draw()
+#             # 更新曲线数据并重绘
+#             self.update_curve(self.widget_8.canvas, *decimate_minmax(t, FS_signal),
+#                               '计算点深度（m）', '最大内挤压力（Mpa）', ' 最大内挤压力模型 ')
 #
-#         # 保存为图片文件
-#         self.widget_8.canvas.figure.savefig(self.temp_image_path[4], dpi=300, bbox_inches='tight')
+#             # 登记报告图表，导出时再渲染为图片
+#             self.chart_canvases[4] = self.widget_8.canvas
 #
-#         # 显示最大内压力
-#         self.lineEdit_4.setText(f"{self.gas_Effective_internal_pressure.p_bh:.2f}")
+#             # 显示最大内压力
+#             self.lineEdit_4.setText(f"{self.gas_Effective_internal_pressure.p_bh:.2f}")
 #
-#         self.calc_result['最大内压力'] = self.gas_Effective_internal_pressure.p_bh
+#             self.calc_result['最大内压力'] = self.gas_Effective_internal_pressure.p_bh
 #
+#             self.stage_done("gas_effective_internal_pressure_graph")
+#
+#         self.start_job("gas_effective_internal_pressure_graph", compute, apply)
+#
+#     @traced
 #     def oil_effective_internal_squeeze_pressure_graph(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
 #
 #         """
 #         # 失效判定——油井最大内压力
-#         self.oil_Effective_internal_squeeze_pressure = cm.Oil_Effective_internal_squeeze_pressure(
+#         params = dict(
 #             rho_max=self.doubleSpinBox_42.value(),
 #             rho_w=self.doubleSpinBox_46.value(),
 #             G=self.doubleSpinBox_47.value(),
@@ -860,49 +1795,42 @@ print(40*"*")
 #             H_s=self.doubleSpinBox_44.value(),
 #             casing_type=self.comboBox_4.currentText()
 #         )
-#         self.P_bh = self.oil_Effective_internal_squeeze_pressure.p_be
-#
-#         length_of_signal = 50
-#         t = np.linspace(0.1, 10000, length_of_signal)
-#         FS_signal = []
-#         for i in range(length_of_signal):
-#             FS = cm.Oil_Effective_internal_squeeze_pressure(
-#                 rho_max=self.doubleSpinBox_42.value(),
-#                 rho_w=self.doubleSpinBox_46.value(),
-#                 G=self.doubleSpinBox_47.value(),
-#                 h=t[i],
-#                 H_s=self.doubleSpinBox_44.value(),
-#                 casing_type=self.comboBox_4.currentText()
-#             )
-#             FS_signal.append(FS.p_be)
-#
-#         print(FS_signal)
+#         length_of_signal = self.length_of_signal
 #
-#         # 设定字体为微软雅黑
-#         plt.rcParams['font.sans-serif'] = ['Microsoft Yahei']
+#         def compute(token):
+#             with trace_stage("model_eval"):
+#                 pressure = MODEL_CACHE.get(cm.Oil_Effective_internal_squeeze_pressure, **params)
 #
-#         # 清除当前图形以便绘制新的信号
-#         self.widget_9.canvas.axes.clear()
-#         # 绘制信号
-#         self.widget_9.canvas.axes.plot(t, FS_signal)
-#         # 设置x轴标签
-#         self.widget_9.canvas.axes.set_xlabel('计算点深度（m）')  # 设置图像标签
-#         # 设置y轴标签
-#         self.widget_9.canvas.axes.set_ylabel('最大内挤压力（Mpa）')
-#         # 设置图形标题
-#         self.widget_9.canvas.axes.set_title(' 最大内挤压力模型 ')
+#             t = np.linspace(0.1, 10000, length_of_signal)
+#             FS_signal = []
+#             with trace_stage("sweep", length_of_signal):
+#                 for i in range(length_of_signal):
+#                     token.check(i, length_of_signal)
+#                     FS = MODEL_CACHE.get(cm.Oil_Effective_internal_squeeze_pressure, **dict(params, h=t[i]))
+#                     FS_signal.append(FS.p_be)
+#             return pressure, t, FS_signal
 #
-#         # 绘制图形
-#         self.widget_9.canvas.draw()
+#         def apply(result):
+#             self.oil_Effective_internal_squeeze_pressure, t, FS_signal = result
+#             self.P_bh = self.oil_Effective_internal_squeeze_pressure.p_be
 #
-#         # 保存为图片文件
-#         self.widget_9.canvas.figure.savefig(self.temp_image_path[4], dpi=300, bbox_inches='tight')
+#             # 更新曲线数据并重绘
+#             self.update_curve(self.widget_9.canvas, *decimate_minmax(t, FS_signal),
+#                               '计算点深度（m）', '最大内挤压力（Mpa）', ' 最大内挤压力模型 ')
 #
-#         # 显示最大内挤压力
-#         self.lineEdit_5.setText(f"{self.oil_Effective_internal_squeeze_pressure.p_be:.2f}")
+#             # 登记报告图表，导出时再渲染为图片
+#             self.chart_canvases[4] = self.widget_9.canvas
 #
-#         self.calc_result['最大内压力'] = self.oil_Effective_internal_squeeze_pressure.p_be
+#             # 显示最大内挤压力
+#             self.lineEdit_5.setText(f"{self.oil_Effective_internal_squeeze_pressure.p_be:.2f}")
 #
+#             self.calc_result['最大内压力'] = self.oil_Effective_internal_squeeze_pressure.p_be
+#
+#             self.stage_done("oil_effective_internal_squeeze_pressure_graph")
+#
+#         self.start_job("oil_effective_internal_squeeze_pressure_graph", compute, apply)
+#
+#     @traced
 #     def effective_internal_pressure_failure_condition_calculate(self):  # 更新图像数据
 #         """
 #         更新图形界面中的数据。
@@ -919,14 +1847,16 @@ print(40*"*")
 #             else:
 #                 Y_p = 600
 #             # 套管在内压、外压作用下失效判定条件
-#             self.effective_internal_pressure_failure_condition = cm.Effective_internal_pressure_failure_condition(
-#                 d=self.doubleSpinBox_55.value(),
-#                 d_c=self.d_c,
-#                 d_m=self.d_m,
-#                 d_f=self.d_f,
-#                 Y_p=Y_p,
-#                 D=self.doubleSpinBox_52.value()
-#             )
+#             with trace_stage("model_eval"):
+#                 self.effective_internal_pressure_failure_condition = MODEL_CACHE.get(
+#                     cm.Effective_internal_pressure_failure_condition,
+#                     d=self.doubleSpinBox_55.value(),
+#                     d_c=self.d_c,
+#                     d_m=self.d_m,
+#                     d_f=self.d_f,
+#                     Y_p=Y_p,
+#                     D=self.doubleSpinBox_52.value()
+#                 )
 #
 #             # 显示剩余抗内挤强度
 #             self.lineEdit_3.setText(f"{self.effective_internal_pressure_failure_condition.P_bo:.2f}")
@@ -955,6 +1885,8 @@ print(40*"*")
 #                     self.lineEdit.setText("危险")
 #                     self.lineEdit.setStyleSheet("color: red;")
 #                     self.calc_result['安全等级'] = "危险"
+#
+#                 self.stage_done(FINAL_STAGE)
 #             else:
 #                 QMessageBox.warning(self, "提示", "请先计算")
 #                 raise ValueError("剩余强度必须大于0")
@@ -962,6 +1894,7 @@ print(40*"*")
 #         except Exception as e:
 #             print(f"求解过程中发生错误: {str(e)}")
 #
+#     @traced
 #     def open_excel_file(self):
 #         """
 #             打开 Excel 文件并将数据加载对应控件中
@@ -976,146 +1909,25 @@ print(40*"*")
 #             return  # 用户取消选择
 #
 #         try:
-#             # 使用 pandas 读取 Excel 文件
-#             df = pd.read_excel(file_path)
+#             table = read_input_table(file_path)
 #
 #             # 检查数据是否为空
-#             if df.empty:
+#             if table.size == 0:
 #                 QMessageBox.warning(self, "警告", "Excel 文件中没有数据!")
 #                 return
 #
 #             dialog = ExcelDataSelector()
-#             rows = df.iloc[0:50]
-#             print(rows)
+#             print(table)
 #
 #             if dialog.exec_():
 #                 selections = dialog.getSelections()
-#                 # 获取用户选择
-#                 well_type = selections["well_type"]
-#                 wear_model = selections["wear_model"]
-#                 # environment = selections["environment"]
-#                 formation = selections["formation"]
-#                 # 根据选择加载对应的数据
-#                 if well_type == "气井数据":
-#                     # 从Excel中加载气井数据
-#                     '''填充冲蚀数据'''
-#                     self.doubleSpinBox_3.setValue(rows.iloc[0, 1])
-#                     self.doubleSpinBox_2.setValue(rows.iloc[1, 1])
-#                     self.doubleSpinBox_5.setValue(rows.iloc[2, 1])
-#
-#                     if rows.iloc[3, 1] == "圆形":
-#                         self.comboBox.setCurrentText("圆形")
-#                     elif rows.iloc[3, 1] == "半圆形":
-#                         self.comboBox.setCurrentText("半圆形")
-#                     else:
-#                         self.comboBox.setCurrentText("角形")
-#
-#                     self.doubleSpinBox_67.setValue(rows.iloc[4, 1])
-#                     self.doubleSpinBox_68.setValue(rows.iloc[5, 1])
-#                     self.doubleSpinBox_69.setValue(rows.iloc[6, 1])
-#                     '''填充最大内压力数据'''
-#                     if rows.iloc[25, 1] == "表层套管和技术套管":
-#                         self.comboBox_3.setCurrentText("表层套管和技术套管")
-#                     else:
-#                         self.comboBox_3.setCurrentText("生产套管和生产尾管")
-#
-#                     self.doubleSpinBox_36.setValue(rows.iloc[32, 1])
-#                     self.doubleSpinBox_40.setValue(rows.iloc[33, 1])
-#                     self.doubleSpinBox_39.setValue(rows.iloc[30, 1])
-#                     self.doubleSpinBox_41.setValue(rows.iloc[40, 1])
-#                     self.doubleSpinBox_37.setValue(rows.iloc[34, 1])
-#                     self.doubleSpinBox_38.setValue(rows.iloc[35, 1])
-#
-#                 else:  # 油井数据
-#                     '''填充冲蚀数据'''
-#                     self.doubleSpinBox_8.setValue(rows.iloc[1, 1])
-#                     self.doubleSpinBox_64.setValue(rows.iloc[7, 1])
-#                     self.doubleSpinBox_12.setValue(rows.iloc[6, 1])
-#                     self.doubleSpinBox_13.setValue(rows.iloc[2, 1])
-#                     self.doubleSpinBox_20.setValue(rows.iloc[8, 1])
-#                     self.doubleSpinBox_19.setValue(rows.iloc[9, 1])
-#                     self.doubleSpinBox_17.setValue(rows.iloc[5, 1])
-#                     self.doubleSpinBox_21.setValue(rows.iloc[10, 1])
-#                     '''填充最大内压力'''
-#                     if rows.iloc[25, 1] == "表层套管和技术套管":
-#                         self.comboBox_4.setCurrentText("表层套管和技术套管")
-#                     else:
-#                         self.comboBox_4.setCurrentText("生产套管和生产尾管")
-#
-#                     self.doubleSpinBox_42.setValue(rows.iloc[32, 1])
-#                     self.doubleSpinBox_46.setValue(rows.iloc[29, 1])
-#                     self.doubleSpinBox_47.setValue(rows.iloc[36, 1])
-#                     self.doubleSpinBox_43.setValue(rows.iloc[30, 1])
-#                     self.doubleSpinBox_44.setValue(rows.iloc[34, 1])
-#
-#                 # 根据磨损模型加载不同的参数
-#                 if wear_model == "套管磨损面积(线性关系)":
-#                     self.doubleSpinBox_26.setValue(rows.iloc[11, 1])
-#                     self.doubleSpinBox_27.setValue(rows.iloc[12, 1])
-#                     self.doubleSpinBox_25.setValue(rows.iloc[13, 1])
-#                     self.doubleSpinBox_24.setValue(rows.iloc[14, 1])
-#                     self.doubleSpinBox_22.setValue(rows.iloc[15, 1])
-#                     self.doubleSpinBox_23.setValue(rows.iloc[16, 1])
-#                     self.doubleSpinBox_30.setValue(rows.iloc[39, 1]/2)
-#                     self.doubleSpinBox_71.setValue(rows.iloc[41, 1])
-#                     self.doubleSpinBox_28.setValue(rows.iloc[42, 1])
-#                     self.doubleSpinBox_29.setValue(rows.iloc[43, 1])
-#                     self.doubleSpinBox_45.setValue(rows.iloc[44, 1])
-#                     self.doubleSpinBox_49.setValue(rows.iloc[45, 1])
-#                     self.doubleSpinBox_50.setValue(rows.iloc[46, 1])
-#
-#                 else:  # 几何关系
-#                     self.doubleSpinBox_28.setValue(rows.iloc[14, 1] / 2)
-#                     self.doubleSpinBox_30.setValue(rows.iloc[17, 1])
-#
-#                 # 为腐蚀环境加载不同的参数
-#                 if rows.iloc[18, 1] == "碳钢":
-#                     self.comboBox.setCurrentText("碳钢")
-#                 elif rows.iloc[18, 1] == "1Cr":
-#                     self.comboBox.setCurrentText("1Cr")
-#                 else:
-#                     self.comboBox.setCurrentText("3Cr")
-#
-#                 self.doubleSpinBox.setValue(rows.iloc[19, 1])
-#                 self.doubleSpinBox_32.setValue(rows.iloc[20, 1])
-#                 self.doubleSpinBox_34.setValue(rows.iloc[21, 1])
-#                 self.doubleSpinBox_33.setValue(rows.iloc[22, 1])
-#                 self.doubleSpinBox_35.setValue(rows.iloc[23, 1])
-#                 self.doubleSpinBox_54.setValue(rows.iloc[24, 1])
-#
-#                 # 根据地层类型加载不同的参数
-#                 if formation == "非塑性蠕变地层":
-#                     if rows.iloc[25, 1] == "表层套管和技术套管":
-#                         self.comboBox_5.setCurrentText("表层套管和技术套管")
-#                     else:
-#                         self.comboBox_5.setCurrentText("生产套管和生产尾管")
-#
-#                     self.doubleSpinBox_56.setValue(rows.iloc[24, 1])
-#                     self.doubleSpinBox_57.setValue(rows.iloc[27, 1])
-#                     self.doubleSpinBox_59.setValue(rows.iloc[28, 1])
-#                     self.doubleSpinBox_65.setValue(rows.iloc[29, 1])
-#                     self.doubleSpinBox_58.setValue(rows.iloc[30, 1])
-#                 else:  # 塑性蠕变地层
-#                     if rows.iloc[25, 1] == "表层套管和技术套管":
-#                         self.comboBox_6.setCurrentText("表层套管和技术套管")
-#                     else:
-#                         self.comboBox_6.setCurrentText("生产套管和生产尾管")
-#
-#                     self.doubleSpinBox_60.setValue(rows.iloc[28, 1])
-#                     self.doubleSpinBox_66.setValue(rows.iloc[29, 1])
-#                     self.doubleSpinBox_62.setValue(rows.iloc[27, 1])
-#                     self.doubleSpinBox_63.setValue(rows.iloc[31, 1])
-#                     self.doubleSpinBox_61.setValue(rows.iloc[30, 1])
-#
-#                 self.doubleSpinBox_48.setValue(rows.iloc[6, 1])
-#                 self.doubleSpinBox_51.setValue(rows.iloc[24, 1])
-#                 if rows.iloc[37, 1] == "N80":
-#                     self.comboBox_7.setCurrentText("N80")
-#                 else:
-#                     self.comboBox_7.setCurrentText("P110")
-#
-#                 self.doubleSpinBox_52.setValue(rows.iloc[39, 1])
-#                 self.doubleSpinBox_55.setValue(rows.iloc[38, 1])
+#                 # 根据选择，按字段映射加载对应的数据（表格第 1 列为本井数据），再按参数找到对应的输入控件
+#                 for selector in select_fields(selections):
+#                     keys, values, combos = extract_fields(selector, table)
+#                     for key, value in zip(keys, values[:, 0]):
+#                         getattr(self, FIELD_WIDGETS[key]).setValue(value)
+#                     for key, texts in combos:
+#                         getattr(self, FIELD_WIDGETS[key]).setCurrentText(texts[0])
 #
 #                 # 显示成功消息
 #                 QMessageBox.information(self, "成功", f"已成功加载 Excel 文件")
@@ -1130,15 +1942,13 @@ print(40*"*")
 #             # 错误处理
 #             QMessageBox.critical(self, "错误", f"打开文件时出错: {str(e)}")
 #
+#     @traced
 #     def export_to_template(self):
 #         """使用模板导出结果"""
 #         if any(v is None for v in self.calc_result.values()):
 #             QMessageBox.warning(self, "提示", "请先计算")
 #             return
 #
-#         # # 保存当前图表
-#         # self.figure.savefig(self.temp_image_path)
-#
 #         # 选择模板文件
 #         template_path, _ = QFileDialog.getOpenFileName(
 #             self, "选择Word模板", "", "Word文档 (*.docx)"
@@ -1156,31 +1966,204 @@ print(40*"*")
 #             return
 #
 #         try:
-#             # 使用模板填充结果
-#             success, message, output_file = fill_template_with_results(
-#                 template_path,
-#                 self.calc_result,
-#                 self.temp_image_path,
-#                 output_path
-#             )
+#             # 按需渲染报告图表（图形只能在界面线程中绘制）
+#             self.render_charts()
+#         except Exception as e:
+#             QMessageBox.critical(self, "错误", f"生成文档失败: {str(e)}")
+#             return
+#
+#         # 填充模板和保存在后台进行，使用当前结果的副本
+#         result_dict = dict(self.calc_result)
+#         chart_images = list(self.chart_images)
+#
+#         def compute(token):
+#             return fill_template_with_results(template_path, result_dict, chart_images, output_path)
 #
+#         def apply(result):
+#             success, message, output_file = result
 #             if success:
 #                 self.last_template_output = output_file  # 记录模板导出的文件路径
 #                 QMessageBox.information(self, "成功", f"已使用模板生成文档:\n{output_path}")
 #             else:
 #                 QMessageBox.warning(self, "警告", message)
 #
+#         def fail(message):
+#             QMessageBox.critical(self, "错误", f"生成文档失败: {message}")
+#
+#         self.start_job("export", compute, apply, fail)
+#
+#     def update_curve(self, canvas, x, y, xlabel, ylabel, title):
+#         """
+#         更新画布上的曲线
+#
+#         每个画布只在首次绘制时创建曲线，之后用 set_data 更新数据，标签和标题变化时才重设；
+#         重绘交给 draw_idle，连续多次更新只重绘一次。
+#         """
+#         axes = canvas.axes
+#         line = self.curves.get(canvas)
+#         if line is None:
+#             line, = axes.plot(x, y)
+#             self.curves[canvas] = line
+#         else:
+#             line.set_data(x, y)
+#
+#         if axes.get_xlabel() != xlabel:
+#             axes.set_xlabel(xlabel)
+#         if axes.get_ylabel() != ylabel:
+#             axes.set_ylabel(ylabel)
+#         if axes.get_title() != title:
+#             axes.set_title(title)
+#
+#         axes.relim()
+#         axes.autoscale_view()
+#         canvas.draw_idle()
+#
+#     def render_charts(self):
+#         """导出前渲染报告图表，只重新渲染数据有变化的图表"""
+#         for i, canvas in enumerate(self.chart_canvases):
+#             if canvas is None:
+#                 continue
+#             chart_hash = chart_data_hash(canvas.figure)
+#             if chart_hash == self.chart_hashes[i] and self.chart_images[i] is not None:
+#                 continue
+#             buffer = io.BytesIO()
+#             with trace_stage("savefig"):
+#                 canvas.figure.savefig(buffer, format='png', dpi=300, bbox_inches='tight')
+#             self.chart_images[i] = buffer.getvalue()
+#             self.chart_hashes[i] = chart_hash
+#
+#     def on_input_changed(self, stage):
+#         """输入控件变化：取消该环节正在进行的计算并标记环节过期，实时计算模式下重新开始防抖计时"""
+#         self.cancel_job(stage)
+#         for name in self.stage_graph.edited(stage, self.live_mode):
+#             getattr(self, name).clear()
+#         if self.live_mode:
+#             self.live_timer.start()  # 计时中再次调用会重新计时，连续修改合并为一次重算
+#
+#     def set_live_mode(self, enabled):
+#         """开启或关闭实时计算"""
+#         self.live_mode = enabled
+#         if not enabled:
+#             self.live_timer.stop()
+#             self.stage_graph.pending.clear()
+#
+#     def set_signal_length(self):
+#         """设置曲线计算点数，重新计算曲线后生效"""
+#         length, ok = QInputDialog.getInt(self, "曲线计算点数", "每条曲线的计算点数：",
+#                                          self.length_of_signal, *SIGNAL_LENGTH_RANGE, 1000)
+#         if not ok:
+#             return
+#         if length > SLOW_SIGNAL_LENGTH:
+#             # 曲线的每个点都要单独构造一次计算模型，耗时与点数成正比
+#             answer = QMessageBox.question(
+#                 self, "曲线计算点数",
+#                 f"曲线的每个点都要单独调用一次计算模型，{length} 个点可能需要较长时间（可在状态栏查看进度）。\n是否继续？")
+#             if answer != QMessageBox.Yes:
+#                 return
+#         self.length_of_signal = length
+#         self.statusBar().showMessage(f"曲线计算点数已设为 {length}，重新计算后生效")
+#
+#     def live_recalculate(self):
+#         """
+#         防抖结束后重算期间修改过的环节及其余结果来源已过期的环节，
+#         后台计算完成且外压力和内压力都已算出时再更新失效判定
+#         """
+#         try:
+#             for stage in self.stage_graph.take_pending(self.jobs):
+#                 getattr(self, stage)()
+#             self.request_final("live")
+#
 #         except Exception as e:
-#             QMessageBox.critical(self, "错误", f"生成文档失败: {str(e)}")
+#             print(f"求解过程中发生错误: {str(e)}")
 #
-#     def closeEvent(self, event):
-#         """清理临时文件"""
-#         for file_path in self.temp_image_path:
-#             # 确保路径是字符串且文件存在
-#             if isinstance(file_path, str) and os.path.exists(file_path):
-#                 os.remove(file_path)
-#         event.accept()
+#     def stage_done(self, stage):
+#         """环节计算完成：记录输出量的来源，清空已过期的失效判定显示"""
+#         for name in self.stage_graph.done(stage):
+#             getattr(self, name).clear()
+#
+#     def recalculate_stale_sources(self):
+#         """重算结果来源已过期、且没有正在后台计算的上游环节"""
+#         for stage in self.stage_graph.stale_sources(self.jobs):
+#             getattr(self, stage)()
 #
 #     def calculate_all(self):
+#         """只重算过期的环节：先重算结果来源已过期的上游环节，后台计算完成后再重算失效判定"""
+#         self.recalculate_stale_sources()
+#         self.request_final("all")
+#
+#     def request_final(self, request):
+#         """请求运行失效判定："all" 总是运行，"live" 只在外压力和内压力都已算出时运行"""
+#         self.stage_graph.request_final(request)
+#         self.run_final_when_idle()
+#
+#     def run_final_when_idle(self):
+#         """上游环节的后台计算都完成后运行已请求的失效判定"""
+#         busy = any(name in ASSESSMENT_STAGES for name in self.jobs)
+#         if self.stage_graph.take_final(busy, self.P_ce > 0 and self.P_bh > 0):
+#             self.effective_internal_pressure_failure_condition_calculate()
+#
+#     def start_job(self, name, compute, apply, fail=None):
+#         """
+#         在线程池中运行 compute(token)，完成后在界面线程中调用 apply(结果)
 #
-#         return
+#         控件只能在界面线程中访问，compute 只能使用提交前读取好的输入。同名任务正在运行时先取消，
+#         只应用最后一次提交的结果。计算出错时调用 fail(错误信息)，未提供时打印错误。
+#         """
+#         job = Job(compute)
+#         self.jobs.start(name, job.token)
+#         job.signals.finished.connect(lambda result: self.on_job_finished(name, job, apply, result))
+#         job.signals.failed.connect(lambda message: self.on_job_failed(name, job, fail, message))
+#         job.signals.progress.connect(self.update_progress)
+#         self.update_progress()
+#         self.thread_pool.start(job)
+#
+#     def cancel_job(self, name):
+#         """取消正在运行的任务，其结果不会再被应用"""
+#         if self.jobs.cancel(name):
+#             self.update_progress()
+#
+#     def on_job_finished(self, name, job, apply, result):
+#         """后台任务完成：仍是同名任务中最新的一个时应用结果"""
+#         if not self.jobs.finish(name, job.token):
+#             return  # 已被取消或被新任务取代
+#         self.update_progress()
+#         try:
+#             apply(result)
+#         except Exception as e:
+#             self.stage_graph.drop_final()
+#             print(f"求解过程中发生错误: {str(e)}")
+#         self.run_final_when_idle()
+#
+#     def on_job_failed(self, name, job, fail, message):
+#         """后台任务出错：提示错误，计算环节出错时放弃待运行的失效判定"""
+#         if not self.jobs.finish(name, job.token):
+#             return
+#         self.update_progress()
+#         if self.stage_graph.stage_failed(name) == "all":
+#             # 点击计算按钮后等待的失效判定不会再运行，需要告知用户
+#             QMessageBox.warning(self, "计算失败", f"上游环节计算出错，未进行失效判定：\n{message}")
+#             return
+#         if fail is not None:
+#             fail(message)
+#         else:
+#             print(f"求解过程中发生错误: {message}")
+#
+#     def update_progress(self, *args):
+#         """状态栏进度条显示后台任务中最慢的进度，没有任务时隐藏"""
+#         percent = self.jobs.progress()
+#         if percent is None:
+#             self.progress_bar.hide()
+#             return
+#         self.progress_bar.setValue(percent)
+#         self.progress_bar.show()
+#
+#     def closeEvent(self, event):
+#         """关闭窗口时取消后台任务并等待线程结束"""
+#         self.jobs.cancel_all()
+#         self.thread_pool.waitForDone()
+#         event.accept()
+
+if __name__ == "__main__":
+    # 启动耗时报告（可选）：设置环境变量 CASING_IMPORT_REPORT=1 后，导入全部延迟模块并输出各模块耗时
+    if os.environ.get("CASING_IMPORT_REPORT"):
+        print(import_time_report(_DEFERRED_MODULES))